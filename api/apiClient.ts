@@ -1,5 +1,13 @@
 // Real backend API client
-const API_BASE_URL = 'http://localhost:8000/api';
+export const API_BASE_URL = 'http://localhost:8000/api';
+
+// Send and store cookies on every call. After a write the backend sets a short-lived
+// db_read_primary_until cookie so this client's next reads see the write (read replicas).
+// The API is on another origin, so its CORS config must keep allow_credentials=True
+// with explicit origins (not "*").
+function apiFetch(input: string, init: RequestInit = {}) {
+  return fetch(input, { credentials: 'include', ...init });
+}
 
 interface JoinEventParams {
   event_id: string;
@@ -47,17 +55,37 @@ export const apiClient = {
   },
 
   async getUsers() {
-    const response = await fetch(`${API_BASE_URL}/users`);
+    const response = await apiFetch(`${API_BASE_URL}/users`);
     if (!response.ok) throw new Error('Failed to fetch users');
     return response.json();
   },
 
   async getUser(user_id: string) {
-    const response = await fetch(`${API_BASE_URL}/users/${user_id}`);
+    const response = await apiFetch(`${API_BASE_URL}/users/${user_id}`);
     if (!response.ok) throw new Error('Failed to fetch user');
     return response.json();
   },
 
+  // viewer_id adds the viewer's friendship with this user (viewer_friendship)
+  async getUserProfile(user_id: string, viewer_id?: string) {
+    const params = viewer_id ? `?viewer_id=${viewer_id}` : '';
+    const response = await apiFetch(`${API_BASE_URL}/users/${user_id}/profile${params}`);
+    if (!response.ok) throw new Error('Failed to fetch user profile');
+    return response.json();
+  },
+
+  async batchGetUsers(ids: string[]) {
+    const response = await apiFetch(`${API_BASE_URL}/users:batchGet`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ ids }),
+    });
+    if (!response.ok) throw new Error('Failed to fetch users');
+    return response.json();
+  },
+
   // ============= EVENT ENDPOINTS =============
 
   async getEvents(filters?: { category?: string; search?: string; creator_id?: string; current_user_id?: string }) {
@@ -68,7 +96,7 @@ export const apiClient = {
     if (filters?.current_user_id) params.append('current_user_id', filters.current_user_id);
 
     const url = `${API_BASE_URL}/events${params.toString() ? '?' + params.toString() : ''}`;
-    const response = await fetch(url);
+    const response = await apiFetch(url);
 
     if (!response.ok) {
       const error = await response.json();
@@ -79,7 +107,7 @@ export const apiClient = {
   },
 
   async getEvent(event_id: string) {
-    const response = await fetch(`${API_BASE_URL}/events/${event_id}`);
+    const response = await apiFetch(`${API_BASE_URL}/events/${event_id}`);
 
     if (!response.ok) {
       const error = await response.json();
@@ -89,8 +117,26 @@ export const apiClient = {
     return response.json();
   },
 
+  async batchGetEvents(ids: string[], current_user_id?: string) {
+    const params = current_user_id ? `?current_user_id=${current_user_id}` : '';
+    const response = await apiFetch(`${API_BASE_URL}/events:batchGet${params}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ ids }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to fetch events');
+    }
+
+    return response.json();
+  },
+
   async createEvent(event: CreateEventParams) {
-    const response = await fetch(`${API_BASE_URL}/events`, {
+    const response = await apiFetch(`${API_BASE_URL}/events`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -109,7 +155,7 @@ export const apiClient = {
   // ============= EVENT PARTICIPANT ENDPOINTS =============
 
   async joinEvent({ event_id, user_id }: JoinEventParams) {
-    const response = await fetch(`${API_BASE_URL}/events/${event_id}/join`, {
+    const response = await apiFetch(`${API_BASE_URL}/events/${event_id}/join`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -129,7 +175,7 @@ export const apiClient = {
   },
 
   async leaveEvent({ event_id, user_id }: JoinEventParams) {
-    const response = await fetch(`${API_BASE_URL}/events/${event_id}/leave/${user_id}`, {
+    const response = await apiFetch(`${API_BASE_URL}/events/${event_id}/leave/${user_id}`, {
       method: 'DELETE',
       headers: {
         'Content-Type': 'application/json',
@@ -152,8 +198,26 @@ export const apiClient = {
     return null;
   },
 
+  // Join and leave several events at once; check each result's status
+  async batchParticipations(user_id: string, changes: { join?: string[]; leave?: string[] }) {
+    const response = await apiFetch(`${API_BASE_URL}/users/${user_id}/participations:batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ join: changes.join ?? [], leave: changes.leave ?? [] }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to update participations');
+    }
+
+    return response.json();
+  },
+
   async getEventParticipants(event_id: string) {
-    const response = await fetch(`${API_BASE_URL}/events/${event_id}/participants`);
+    const response = await apiFetch(`${API_BASE_URL}/events/${event_id}/participants`);
 
     if (!response.ok) {
       const error = await response.json();
@@ -170,7 +234,7 @@ export const apiClient = {
     if (status_filter) params.append('status_filter', status_filter);
 
     const url = `${API_BASE_URL}/users/${user_id}/friendships${params.toString() ? '?' + params.toString() : ''}`;
-    const response = await fetch(url);
+    const response = await apiFetch(url);
 
     if (!response.ok) {
       const error = await response.json();
@@ -181,7 +245,7 @@ export const apiClient = {
   },
 
   async createFriendship(data: CreateFriendshipParams) {
-    const response = await fetch(`${API_BASE_URL}/friendships`, {
+    const response = await apiFetch(`${API_BASE_URL}/friendships`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -197,7 +261,7 @@ export const apiClient = {
     return response.json();
   },
   async deleteFriendship(friendship_id: string) {
-    const response = await fetch(`${API_BASE_URL}/friendships/${friendship_id}`, {
+    const response = await apiFetch(`${API_BASE_URL}/friendships/${friendship_id}`, {
       method: 'DELETE',
       headers: {
         'Content-Type': 'application/json',
@@ -227,7 +291,7 @@ export const apiClient = {
     if (event_id) params.append('event_id', event_id);
 
     const url = `${API_BASE_URL}/moments${params.toString() ? '?' + params.toString() : ''}`;
-    const response = await fetch(url);
+    const response = await apiFetch(url);
 
     if (!response.ok) {
       const error = await response.json();
@@ -238,7 +302,7 @@ export const apiClient = {
   },
 
   async createMoment(data: CreateMomentParams) {
-    const response = await fetch(`${API_BASE_URL}/moments`, {
+    const response = await apiFetch(`${API_BASE_URL}/moments`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -256,7 +320,7 @@ export const apiClient = {
 
   // ============= ADMIN / MANAGEMENT =============
   async deleteEvent(event_id: string) {
-    const response = await fetch(`${API_BASE_URL}/events/${event_id}`, {
+    const response = await apiFetch(`${API_BASE_URL}/events/${event_id}`, {
       method: 'DELETE',
       headers: {
         'Content-Type': 'application/json',
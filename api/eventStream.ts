@@ -0,0 +1,111 @@
+// Live event updates over server-sent events (GET /api/stream/events)
+import { useEffect } from 'react';
+import { QueryClient, useQueryClient } from '@tanstack/react-query';
+import { API_BASE_URL } from '@/api/apiClient';
+
+// Matches PARTICIPANT_PREVIEW_SIZE in the backend
+const PARTICIPANT_PREVIEW_SIZE = 3;
+
+interface ParticipantJoined {
+  type: 'participant_joined';
+  event_id: string;
+  participant_count: number;
+  user: { user_id: string; name: string; photo: string };
+}
+
+interface ParticipantLeft {
+  type: 'participant_left';
+  event_id: string;
+  participant_count: number;
+  user_id: string;
+}
+
+type StreamMessage = ParticipantJoined | ParticipantLeft;
+
+// List pages carry a preview of the participants; the event detail carries all of them
+function applyToEvent(event: any, message: StreamMessage, currentUserId?: string,
+                      maxParticipants = PARTICIPANT_PREVIEW_SIZE) {
+  if (!event || String(event.id) !== message.event_id) return event;
+
+  const updated = { ...event, participant_count: message.participant_count };
+  const participants: any[] = event.participants ?? [];
+  if (message.type === 'participant_joined') {
+    if (participants.length < maxParticipants
+        && !participants.some((p) => String(p.user_id) === message.user.user_id)) {
+      updated.participants = [...participants, message.user];
+    }
+    if (currentUserId === message.user.user_id) updated.current_user_joined = true;
+  } else {
+    updated.participants = participants.filter((p) => String(p.user_id) !== message.user_id);
+    if (currentUserId === message.user_id) updated.current_user_joined = false;
+  }
+  return updated;
+}
+
+function applyParticipantChange(queryClient: QueryClient, message: StreamMessage) {
+  // Event lists are keyed ['events', currentUserId]
+  queryClient.getQueriesData({ queryKey: ['events'] }).forEach(([key, events]) => {
+    if (!Array.isArray(events)) return;
+    const currentUserId = key[1] as string | undefined;
+    queryClient.setQueryData(key, events.map((event) => applyToEvent(event, message, currentUserId)));
+  });
+
+  queryClient.setQueryData(['event', message.event_id], (event: any) => applyToEvent(event, message, undefined, Infinity));
+
+  queryClient.setQueryData(['eventParticipants', message.event_id], (participants: any[] | undefined) => {
+    if (!participants) return participants;
+    if (message.type === 'participant_left') {
+      return participants.filter((p) => String(p.user_id) !== message.user_id);
+    }
+    if (participants.some((p) => String(p.user_id) === message.user.user_id)) return participants;
+    return [...participants, { event_id: message.event_id, user_id: message.user.user_id }];
+  });
+
+  // A preview slot freed up but we do not know who fills it: refetch that event
+  if (message.type === 'participant_left' && message.participant_count >= PARTICIPANT_PREVIEW_SIZE) {
+    queryClient.invalidateQueries({
+      queryKey: ['events'],
+      predicate: (query) => Array.isArray(query.state.data) && query.state.data.some(
+        (event: any) => String(event.id) === message.event_id
+          && (event.participants ?? []).length < PARTICIPANT_PREVIEW_SIZE
+      ),
+    });
+  }
+}
+
+/**
+ * Keep cached events, event lists and participant lists up to date with
+ * changes made by other users, instead of polling. A client's own joins and
+ * leaves are refetched by its mutations, so they show without the stream.
+ * Pass eventId to only receive updates for that event.
+ */
+export function useEventStream(eventId?: string | null) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const url = `${API_BASE_URL}/stream/events${eventId ? `?event_id=${eventId}` : ''}`;
+    const source = new EventSource(url);
+
+    const onParticipantChange = (e: MessageEvent) => applyParticipantChange(queryClient, JSON.parse(e.data));
+    const onEventChange = () => queryClient.invalidateQueries({ queryKey: ['events'] });
+    // Updates were missed (slow client, reconnect): refetch everything shown
+    const onResync = () => {
+      queryClient.invalidateQueries({ queryKey: ['events'] });
+      queryClient.invalidateQueries({ queryKey: ['event'] });
+      queryClient.invalidateQueries({ queryKey: ['eventParticipants'] });
+    };
+
+    source.addEventListener('participant_joined', onParticipantChange);
+    source.addEventListener('participant_left', onParticipantChange);
+    source.addEventListener('event_created', onEventChange);
+    source.addEventListener('event_deleted', onEventChange);
+    source.addEventListener('resync', onResync);
+    // EventSource reconnects on its own; anything sent meanwhile was missed
+    let connected = false;
+    source.onopen = () => {
+      if (connected) onResync();
+      connected = true;
+    };
+    return () => source.close();
+  }, [queryClient, eventId]);
+}
@@ -0,0 +1,39 @@
+"""Add updated_at row versions to events, friendships and moments
+
+Revision ID: 1b6f3c8e9a24
+Revises: e72d94b05a1f
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b6f3c8e9a24'
+down_revision: Union[str, Sequence[str], None] = 'e72d94b05a1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['events', 'friendships', 'moments']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(table, sa.Column(
+            'updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False
+        ))
+        # Existing rows have not changed since they were created
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_updated_at', table_name='users', if_exists=True)
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
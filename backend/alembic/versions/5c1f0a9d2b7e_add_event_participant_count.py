@@ -0,0 +1,38 @@
+"""Add denormalized participant_count to events
+
+Revision ID: 5c1f0a9d2b7e
+Revises: 38759fe88f6e
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0a9d2b7e'
+down_revision: Union[str, Sequence[str], None] = '38759fe88f6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('participant_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    # Backfill from the existing participant rows
+    op.execute(
+        """
+        UPDATE events SET participant_count = (
+            SELECT COUNT(*) FROM event_participants
+            WHERE event_participants.event_id = events.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events', 'participant_count')
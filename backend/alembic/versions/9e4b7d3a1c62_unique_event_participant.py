@@ -0,0 +1,48 @@
+"""Enforce one participation per user and event
+
+Revision ID: 9e4b7d3a1c62
+Revises: 5c1f0a9d2b7e
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7d3a1c62'
+down_revision: Union[str, Sequence[str], None] = '5c1f0a9d2b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drop duplicate joins (keeping the earliest) so the constraint can be added
+    op.execute(
+        """
+        DELETE FROM event_participants a
+        USING event_participants b
+        WHERE a.event_id = b.event_id
+          AND a.user_id = b.user_id
+          AND (a.joined_at, a.id) > (b.joined_at, b.id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE events SET participant_count = (
+            SELECT COUNT(*) FROM event_participants
+            WHERE event_participants.event_id = events.id
+        )
+        """
+    )
+    op.create_unique_constraint(
+        'event_participants_event_id_user_id_key', 'event_participants', ['event_id', 'user_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('event_participants_event_id_user_id_key', 'event_participants', type_='unique')
@@ -0,0 +1,49 @@
+"""Add full-text search vectors for events and users
+
+Revision ID: c3a8e51f7d09
+Revises: 9e4b7d3a1c62
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8e51f7d09'
+down_revision: Union[str, Sequence[str], None] = '9e4b7d3a1c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('simple', title || ' ' || coalesce(description, '') || ' ' || location)",
+            persisted=True,
+        ),
+    ))
+    op.create_index('ix_events_search_vector', 'events', ['search_vector'], postgresql_using='gin')
+
+    op.add_column('users', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('simple', full_name || ' ' || "
+            "regexp_replace(email, '[^[:alnum:]]+', ' ', 'g') || ' ' || coalesce(department, ''))",
+            persisted=True,
+        ),
+    ))
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_search_vector', table_name='users')
+    op.drop_column('users', 'search_vector')
+    op.drop_index('ix_events_search_vector', table_name='events')
+    op.drop_column('events', 'search_vector')
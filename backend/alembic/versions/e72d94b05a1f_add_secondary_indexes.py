@@ -0,0 +1,45 @@
+"""Add secondary indexes for the API filters and orderings
+
+Revision ID: e72d94b05a1f
+Revises: c3a8e51f7d09
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e72d94b05a1f'
+down_revision: Union[str, Sequence[str], None] = 'c3a8e51f7d09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_users_created_at', 'users', ['created_at', 'id']),
+    ('ix_events_start_time', 'events', ['start_time', 'id']),
+    ('ix_events_category_start_time', 'events', ['category', 'start_time', 'id']),
+    ('ix_events_creator_id_start_time', 'events', ['creator_id', 'start_time', 'id']),
+    ('idx_event_participants_user_id', 'event_participants', ['user_id']),
+    ('ix_event_participants_event_id_joined_at', 'event_participants', ['event_id', 'joined_at', 'id']),
+    ('ix_friendships_user_id_friend_id_status', 'friendships', ['user_id', 'friend_id', 'status']),
+    ('ix_friendships_friend_id_status', 'friendships', ['friend_id', 'status']),
+    ('ix_moments_created_at', 'moments', ['created_at', 'id']),
+    ('ix_moments_user_id_created_at', 'moments', ['user_id', 'created_at', 'id']),
+    ('ix_moments_event_id_created_at', 'moments', ['event_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases built from schema.sql may already have some of these
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
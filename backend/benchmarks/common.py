@@ -0,0 +1,66 @@
+# common.py - Shared helpers for the backend micro-benchmarks
+#
+# Benchmarks run the FastAPI app in-process against the configured database,
+# so run them from the backend directory: python -m benchmarks.<name>
+import resource
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import engine
+from main import app
+
+client = TestClient(app)
+
+
+def measure(fn, repeat: int = 50, warmup: int = 5, timer=time.perf_counter) -> dict:
+    """Call fn repeatedly and return latency percentiles in milliseconds.
+
+    Pass timer=time.process_time to measure CPU time (all threads) instead.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = timer()
+        fn()
+        samples.append((timer() - start) * 1000)
+
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def count_statements(fn) -> int:
+    """Call fn once and return how many SQL statements it executed"""
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def report(title: str, rows: dict) -> None:
+    """Print one line per measured case"""
+    print(title)
+    for name, stats in rows.items():
+        print(f"  {name:<28} " + "  ".join(f"{key}={value}" for key, value in stats.items()))
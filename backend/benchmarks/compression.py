@@ -0,0 +1,55 @@
+# compression.py - Bytes on the wire and CPU per page for each compression setting
+#
+# Compresses one /api/events page (participant previews included) at several
+# gzip levels and brotli qualities, to pick COMPRESSION_GZIP_LEVEL and
+# COMPRESSION_BROTLI_QUALITY.
+#
+# Usage (from backend/): python -m benchmarks.compression [events] [participants_per_event]
+import sys
+import time
+
+from benchmarks.common import client, measure, report
+from benchmarks.serialization import BENCH_CATEGORY, cleanup, seed
+from cache import event_cache
+from compression import Compressor, brotli
+
+GZIP_LEVELS = [1, 4, 6, 9]
+BROTLI_QUALITIES = [1, 4, 6, 9, 11]
+
+
+def main(total: int = 100, participants: int = 10) -> None:
+    cleanup()
+    seed(total, participants)
+    backend, event_cache.backend = event_cache.backend, None
+    try:
+        body = client.get(
+            "/api/events", params={"category": BENCH_CATEGORY, "limit": total}, headers={"Accept-Encoding": "identity"}
+        ).content
+
+        settings = [("gzip", level, {"gzip_level": level}) for level in GZIP_LEVELS]
+        if brotli is not None:
+            settings += [("br", quality, {"brotli_quality": quality}) for quality in BROTLI_QUALITIES]
+        else:
+            print("brotli is not installed, skipping br")
+
+        rows = {"identity": {"bytes": len(body), "ratio": 1.0}}
+        for encoding, level, options in settings:
+            compressed = Compressor(encoding, **options).compress(body, final=True)
+            cpu = measure(
+                lambda: Compressor(encoding, **options).compress(body, final=True), repeat=30, timer=time.process_time
+            )
+            rows[f"{encoding} {level}"] = {
+                "bytes": len(compressed),
+                "ratio": round(len(body) / len(compressed), 1),
+                "cpu_p50_ms": cpu["p50_ms"],
+                "cpu_p95_ms": cpu["p95_ms"],
+            }
+
+        report(f"GET /api/events, {total} events per page", rows)
+    finally:
+        event_cache.backend = backend
+        cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,226 @@
+# datagen.py - Generate a large, realistically skewed dataset with COPY
+#
+# Same seed and sizes -> same dataset, so load test runs are comparable:
+#
+#   users           spread over departments, each split into friend circles
+#   events          created by a skewed set of organizers; popularity follows
+#                   a power law (rank ** -alpha), so a few events get most of
+#                   the participations and the long tail gets a handful
+#   participations  drawn per event, mostly from the organizer's department;
+#                   participant_count matches and capped events have room left
+#   friendships     mostly inside a user's circle, some across the campus;
+#                   mostly accepted, some pending or rejected
+#   moments         posted by a sample of participants
+#
+# Everything is tagged with the @loadtest.tum.de email domain; --clean removes
+# it (deleting the users cascades to the rest).
+#
+# Usage (from backend/):
+#   python -m benchmarks.datagen [--users 100000] [--events 20000] [--participations 1000000]
+#                                [--friends 10] [--moments 50000] [--alpha 1.1] [--seed 42]
+#   python -m benchmarks.datagen --clean
+import argparse
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from cache import event_cache
+from database import engine
+
+DOMAIN = "loadtest.tum.de"
+COPY_CHUNK_ROWS = 100000
+
+DEPARTMENTS = [
+    "Informatics", "Mathematics", "Physics", "Chemistry", "Mechanical Engineering",
+    "Electrical Engineering", "Civil Engineering", "Management", "Medicine", "Life Sciences",
+    "Architecture", "Sport and Health Sciences",
+]
+CATEGORIES = ["sports", "study", "party", "food", "culture", "outdoors", "tech", "games"]
+LOCATIONS = ["Garching", "Stammgelände", "Weihenstephan", "Olympiapark", "Mensa Arcisstraße", "Englischer Garten"]
+CIRCLE_SIZE = 50  # users per friend circle
+CIRCLE_FRIEND_SHARE = 0.8  # friendships inside the circle
+DEPARTMENT_PARTICIPANT_SHARE = 0.6  # participants from the organizer's department
+CAPPED_EVENT_SHARE = 0.4  # events with max_participants set
+# Timestamps are relative to a fixed date so the same seed gives the same rows
+REFERENCE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S+00")
+
+
+def _copy(cursor, table: str, columns: list, rows) -> int:
+    """COPY rows (tuples of str/int/None, no tabs or newlines) into table in chunks"""
+    total = 0
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join("\\N" if value is None else str(value) for value in row) + "\n")
+        total += 1
+        if total % COPY_CHUNK_ROWS == 0:
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+            buffer = io.StringIO()
+    if buffer.tell():
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return total
+
+
+def participant_counts(events: int, users: int, participations: int, alpha: float) -> list:
+    """Participants per popularity rank: proportional to rank ** -alpha, at most `users`"""
+    weights = [rank ** -alpha for rank in range(1, events + 1)]
+    scale = participations / sum(weights)
+    return [min(users, int(weight * scale)) for weight in weights]
+
+
+def generate(users: int, events: int, participations: int, friends: int, moments: int,
+             alpha: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    now = REFERENCE_TIME
+    start = time.perf_counter()
+
+    user_ids = [_uuid(rng) for _ in range(users)]
+    user_department = [rng.randrange(len(DEPARTMENTS)) for _ in range(users)]
+    by_department = [[] for _ in DEPARTMENTS]
+    for index, department in enumerate(user_department):
+        by_department[department].append(index)
+    # Friend circles: consecutive members of a department
+    circle_of = {}
+    circles = []
+    for members in by_department:
+        for offset in range(0, len(members), CIRCLE_SIZE):
+            circle = members[offset:offset + CIRCLE_SIZE]
+            for member in circle:
+                circle_of[member] = len(circles)
+            circles.append(circle)
+
+    # Organizers are skewed too: a tenth of the users create most events
+    organizers = rng.sample(range(users), max(1, users // 10))
+    counts = participant_counts(events, users, participations, alpha)
+    event_rows = []
+    for rank in range(events):
+        creator = rng.choice(organizers) if rng.random() < 0.8 else rng.randrange(users)
+        count = counts[rank]
+        capped = rng.random() < CAPPED_EVENT_SHARE
+        event_rows.append([
+            _uuid(rng), creator, count,
+            count + rng.randint(1, 20) if capped else None,
+            now + timedelta(minutes=rng.randint(-30 * 24 * 60, 60 * 24 * 60)),
+        ])
+    rng.shuffle(event_rows)  # popularity is independent of insertion order
+
+    def user_rows():
+        for index, user_id in enumerate(user_ids):
+            department = DEPARTMENTS[user_department[index]]
+            yield (user_id, f"user{index}@{DOMAIN}", f"Load User {index}", None, department,
+                   f"{department} student", _timestamp(now - timedelta(minutes=index)))
+
+    def events_rows():
+        for number, (event_id, creator, count, max_participants, starts) in enumerate(event_rows):
+            category = CATEGORIES[number % len(CATEGORIES)]
+            yield (event_id, user_ids[creator], f"{category.title()} meetup {number}",
+                   f"Generated {category} event", category, LOCATIONS[number % len(LOCATIONS)], None,
+                   _timestamp(starts), _timestamp(starts + timedelta(hours=2)), max_participants, count)
+
+    moment_share = moments / participations if participations else 0
+    moment_pairs = []
+
+    def participant_rows():
+        for event_id, creator, count, _, starts in event_rows:
+            department = by_department[user_department[creator]]
+            chosen = set(rng.sample(department, min(len(department), int(count * DEPARTMENT_PARTICIPANT_SHARE))))
+            while len(chosen) < count:
+                chosen.add(rng.randrange(users))
+            for member in chosen:
+                joined_at = starts - timedelta(minutes=rng.randint(10, 14 * 24 * 60))
+                if rng.random() < moment_share:
+                    moment_pairs.append((event_id, member, starts))
+                yield (_uuid(rng), event_id, user_ids[member], _timestamp(joined_at), "joined")
+
+    def friendship_rows():
+        seen = set()
+        for member in range(users):
+            circle = circles[circle_of[member]]
+            for _ in range(max(friends // 2, 1)):
+                if rng.random() < CIRCLE_FRIEND_SHARE and len(circle) > 1:
+                    other = rng.choice(circle)
+                else:
+                    other = rng.randrange(users)
+                pair = (min(member, other), max(member, other))
+                if other == member or pair in seen:
+                    continue
+                seen.add(pair)
+                roll = rng.random()
+                status = "accepted" if roll < 0.85 else "pending" if roll < 0.95 else "rejected"
+                yield (_uuid(rng), user_ids[member], user_ids[other], status)
+
+    def moment_rows():
+        for number, (event_id, member, starts) in enumerate(moment_pairs):
+            yield (_uuid(rng), user_ids[member], event_id, f"/moments/load-{number}.jpg",
+                   f"Moment {number}", _timestamp(starts + timedelta(hours=3)))
+
+    result = {}
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        result["users"] = _copy(cursor, "users", [
+            "id", "email", "full_name", "profile_photo", "department", "bio", "created_at",
+        ], user_rows())
+        result["events"] = _copy(cursor, "events", [
+            "id", "creator_id", "title", "description", "category", "location", "image_url",
+            "start_time", "end_time", "max_participants", "participant_count",
+        ], events_rows())
+        result["participations"] = _copy(cursor, "event_participants", [
+            "id", "event_id", "user_id", "joined_at", "status",
+        ], participant_rows())
+        result["friendships"] = _copy(cursor, "friendships", ["id", "user_id", "friend_id", "status"], friendship_rows())
+        result["moments"] = _copy(cursor, "moments", [
+            "id", "user_id", "event_id", "photo_url", "caption", "created_at",
+        ], moment_rows())
+        for table in ("users", "events", "event_participants", "friendships", "moments"):
+            cursor.execute(f"ANALYZE {table}")
+
+    event_cache.invalidate_all()
+    result["max_participants_per_event"] = max(counts, default=0)
+    result["median_participants_per_event"] = sorted(counts)[len(counts) // 2] if counts else 0
+    result["seconds"] = round(time.perf_counter() - start, 1)
+    return result
+
+
+def clean() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": DOMAIN})
+    event_cache.invalidate_all()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic load test dataset")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--participations", type=int, default=1000000, help="target; capped per event at --users")
+    parser.add_argument("--friends", type=int, default=10, help="friendships per user (approximate)")
+    parser.add_argument("--moments", type=int, default=50000, help="target")
+    parser.add_argument("--alpha", type=float, default=1.1, help="power-law exponent of event popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clean", action="store_true", help="remove the generated data and exit")
+    args = parser.parse_args()
+
+    clean()
+    if args.clean:
+        return 0
+    result = generate(args.users, args.events, args.participations, args.friends, args.moments, args.alpha, args.seed)
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+# load.py - Drive every API route at a fixed concurrency and write a JSON report
+#
+# Each scenario sends --requests requests (fewer for the exports) through
+# --concurrency concurrent connections and records latency percentiles,
+# throughput and status codes. Ids are sampled from the database, so run
+# benchmarks.datagen first for realistic sizes (the seed data works too).
+# Write scenarios use their own @load-harness.tum.de users and undo what they
+# do (join then leave, create then delete), so runs can be repeated.
+#
+# Without --url the app is started with uvicorn in a subprocess (--workers),
+# using the same environment. Compare two reports to see what a change did.
+#
+# Usage (from backend/):
+#   python -m benchmarks.load run [--url URL] [--workers 1] [--concurrency 16] [--requests 200]
+#                                 [--only SUBSTRING ...] [--seed 1] [--output load-report.json]
+#   python -m benchmarks.load compare OLD.json NEW.json [--threshold 10]
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import httpx
+from sqlalchemy import text
+
+from database import engine
+from metrics import METRICS_ENABLED
+
+HARNESS_DOMAIN = "load-harness.tum.de"
+EXPORT_REQUESTS = 3  # full-table exports are expensive; a few runs are enough
+
+
+class Scenario:
+    """One route under load: build(index) -> (method, path, json body).
+
+    With `keep`, the id of each successful response is stored under its
+    request index for a later scenario (requests whose id is missing are
+    skipped there).
+    """
+
+    def __init__(self, name: str, build: Callable, expect: tuple = (200,), requests: Optional[int] = None,
+                 keep: Optional[dict] = None):
+        self.name = name
+        self.build = build
+        self.expect = expect
+        self.requests = requests
+        self.keep = keep
+
+
+def sample_ids(rng: random.Random) -> dict:
+    """Ids the read scenarios pick from; popular events are sampled more often"""
+    with engine.connect() as conn:
+        def ids(query: str, limit: int = 1000) -> list:
+            return [str(value) for value, in conn.execute(text(query), {"limit": limit})]
+
+        samples = {
+            "users": ids("SELECT id FROM users WHERE email NOT LIKE '%@" + HARNESS_DOMAIN + "' ORDER BY random() LIMIT :limit"),
+            "popular_events": ids("SELECT id FROM events ORDER BY participant_count DESC LIMIT :limit", 100),
+            "events": ids("SELECT id FROM events ORDER BY random() LIMIT :limit"),
+            "open_events": ids("SELECT id FROM events WHERE max_participants IS NULL ORDER BY random() LIMIT :limit"),
+            "moments": ids("SELECT id FROM moments ORDER BY random() LIMIT :limit"),
+            "categories": ids("SELECT DISTINCT category FROM events LIMIT :limit", 20),
+        }
+        counts = conn.execute(text(
+            "SELECT (SELECT count(*) FROM users), (SELECT count(*) FROM events),"
+            " (SELECT count(*) FROM event_participants), (SELECT count(*) FROM friendships),"
+            " (SELECT count(*) FROM moments)"
+        )).one()
+    samples["dataset"] = dict(zip(("users", "events", "participations", "friendships", "moments"), counts))
+    missing = [name for name in ("users", "events", "open_events") if not samples[name]]
+    if missing:
+        raise SystemExit(f"No {', '.join(missing)} in the database; run benchmarks.datagen first")
+    return samples
+
+
+def create_harness_users(count: int) -> list:
+    with engine.begin() as conn:
+        return [str(user_id) for user_id, in conn.execute(text(
+            """
+            INSERT INTO users (email, full_name)
+            SELECT 'harness' || n || '@' || :domain, 'Harness User ' || n FROM generate_series(1, :count) AS n
+            RETURNING id
+            """
+        ), {"domain": HARNESS_DOMAIN, "count": count})]
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": HARNESS_DOMAIN})
+
+
+def scenarios(rng: random.Random, samples: dict, harness: list, requests: int) -> list:
+    """Every route, reads first; write scenarios hand ids to the ones that undo them"""
+    # Without moments, the detail route is measured on its 404 path
+    users, events, moments = samples["users"], samples["events"], samples["moments"] or [str(uuid.UUID(int=0))]
+    popular, open_events, categories = samples["popular_events"], samples["open_events"], samples["categories"]
+
+    def pick(values):
+        return rng.choice(values)
+
+    def event_id():
+        # Half the reads hit the most popular events, like a real feed
+        return pick(popular) if rng.random() < 0.5 else pick(events)
+
+    # Harness user i works on joins[i], created_events[i], ... for request i
+    joins = [(pick(open_events), harness[index]) for index in range(requests)]
+    batches = [[pick(open_events) for _ in range(5)] for _ in range(requests)]
+    created, created_users, friendships, posted = {}, {}, {}, {}
+
+    def event_body(i: int, title: str) -> dict:
+        return {
+            "title": title, "category": "load", "location": "Garching",
+            "start_time": "2026-06-01T18:00:00Z", "creator_id": harness[i],
+        }
+
+    return [
+        Scenario("GET /health", lambda i: ("GET", "/health", None)),
+        Scenario("GET /metrics", lambda i: ("GET", "/metrics", None), expect=(200,) if METRICS_ENABLED else (404,)),
+        Scenario("GET /api/users", lambda i: ("GET", "/api/users?limit=50", None)),
+        Scenario("GET /api/users?search", lambda i: ("GET", "/api/users?limit=50&search=user1", None)),
+        Scenario("GET /api/users/{id}", lambda i: ("GET", f"/api/users/{pick(users)}", None)),
+        Scenario("GET /api/users/{id}/profile", lambda i: ("GET", f"/api/users/{pick(users)}/profile", None)),
+        Scenario("POST /api/users:batchGet",
+                 lambda i: ("POST", "/api/users:batchGet", {"ids": rng.sample(users, min(20, len(users)))})),
+        Scenario("GET /api/events", lambda i: ("GET", "/api/events?limit=100", None)),
+        Scenario("GET /api/events?current_user_id",
+                 lambda i: ("GET", f"/api/events?limit=100&current_user_id={pick(users)}", None)),
+        Scenario("GET /api/events?category",
+                 lambda i: ("GET", f"/api/events?limit=100&category={pick(categories)}", None)),
+        Scenario("GET /api/events?search", lambda i: ("GET", "/api/events?limit=100&search=meetup", None)),
+        Scenario("GET /api/events/{id}", lambda i: ("GET", f"/api/events/{event_id()}", None)),
+        Scenario("POST /api/events:batchGet",
+                 lambda i: ("POST", "/api/events:batchGet", {"ids": rng.sample(events, min(20, len(events)))})),
+        Scenario("GET /api/events/{id}/participants",
+                 lambda i: ("GET", f"/api/events/{pick(events)}/participants", None)),
+        Scenario("GET /api/users/{id}/friendships", lambda i: ("GET", f"/api/users/{pick(users)}/friendships", None)),
+        Scenario("GET /api/moments", lambda i: ("GET", "/api/moments?limit=100", None)),
+        Scenario("GET /api/moments?event_id", lambda i: ("GET", f"/api/moments?event_id={event_id()}", None)),
+        Scenario("GET /api/moments?user_id", lambda i: ("GET", f"/api/moments?user_id={pick(users)}", None)),
+        Scenario("GET /api/moments/{id}", lambda i: ("GET", f"/api/moments/{pick(moments)}", None),
+                 expect=(200,) if samples["moments"] else (404,)),
+        Scenario("GET /api/export/events.ndjson", lambda i: ("GET", "/api/export/events.ndjson", None),
+                 requests=EXPORT_REQUESTS),
+        Scenario("GET /api/export/moments.ndjson", lambda i: ("GET", "/api/export/moments.ndjson", None),
+                 requests=EXPORT_REQUESTS),
+        Scenario("GET /api/export/participants.ndjson", lambda i: ("GET", "/api/export/participants.ndjson", None),
+                 requests=EXPORT_REQUESTS),
+        # Writes, each followed by the scenario that undoes it
+        Scenario("POST /api/events/{id}/join",
+                 lambda i: ("POST", f"/api/events/{joins[i][0]}/join", {"event_id": joins[i][0], "user_id": joins[i][1]}),
+                 expect=(201,)),
+        Scenario("DELETE /api/events/{id}/leave/{user_id}",
+                 lambda i: ("DELETE", f"/api/events/{joins[i][0]}/leave/{joins[i][1]}", None), expect=(204,)),
+        Scenario("POST /api/users/{id}/participations:batch (join)",
+                 lambda i: ("POST", f"/api/users/{harness[i]}/participations:batch", {"join": batches[i]})),
+        Scenario("POST /api/users/{id}/participations:batch (leave)",
+                 lambda i: ("POST", f"/api/users/{harness[i]}/participations:batch", {"leave": batches[i]})),
+        Scenario("POST /api/events", lambda i: ("POST", "/api/events", event_body(i, f"Harness event {i}")),
+                 expect=(201,), keep=created),
+        Scenario("PATCH /api/events/{id}",
+                 lambda i: ("PATCH", f"/api/events/{created[i]}", event_body(i, f"Harness event {i} (edited)"))),
+        Scenario("DELETE /api/events/{id}", lambda i: ("DELETE", f"/api/events/{created[i]}", None), expect=(204,)),
+        Scenario("POST /api/friendships",
+                 lambda i: ("POST", "/api/friendships", {"user_id": harness[i], "friend_id": harness[i - 1]}),
+                 expect=(201,), keep=friendships),
+        Scenario("PATCH /api/friendships/{id}",
+                 lambda i: ("PATCH", f"/api/friendships/{friendships[i]}?status_update=accepted", None)),
+        Scenario("DELETE /api/friendships/{id}",
+                 lambda i: ("DELETE", f"/api/friendships/{friendships[i]}", None), expect=(204,)),
+        Scenario("POST /api/moments", lambda i: ("POST", "/api/moments", {
+            "user_id": harness[i], "event_id": pick(events), "photo_url": f"/moments/harness-{i}.jpg",
+        }), expect=(201,), keep=posted),
+        Scenario("DELETE /api/moments/{id}", lambda i: ("DELETE", f"/api/moments/{posted[i]}", None), expect=(204,)),
+        Scenario("POST /api/users", lambda i: ("POST", "/api/users", {
+            "email": f"created{i}@{HARNESS_DOMAIN}", "full_name": f"Created User {i}",
+        }), expect=(201,), keep=created_users),
+        Scenario("PATCH /api/users/{id}", lambda i: ("PATCH", f"/api/users/{created_users[i]}", {
+            "email": f"created{i}@{HARNESS_DOMAIN}", "full_name": f"Created User {i}", "bio": "Edited",
+        })),
+        Scenario("DELETE /api/users/{id}",
+                 lambda i: ("DELETE", f"/api/users/{created_users[i]}", None), expect=(204,)),
+    ]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    return samples[max(math.ceil(fraction * len(samples)) - 1, 0)]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    requests = min(requests, scenario.requests or requests)
+    pending = iter(range(requests))
+    latencies, statuses = [], Counter()
+    skipped = errors = 0
+
+    async def worker():
+        nonlocal skipped, errors
+        for index in pending:
+            try:
+                method, path, body = scenario.build(index)
+            except KeyError:
+                skipped += 1  # the scenario this one depends on failed for this index
+                continue
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+            except httpx.HTTPError as error:
+                errors += 1
+                statuses[type(error).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(response.status_code)] += 1
+            if response.status_code not in scenario.expect:
+                errors += 1
+            elif scenario.keep is not None:
+                scenario.keep[index] = response.json()["id"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    result = {"requests": len(latencies), "errors": errors, "skipped": skipped, "statuses": dict(statuses)}
+    if latencies:
+        result.update({
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "max_ms": round(latencies[-1], 2),
+            "rps": round(len(latencies) / seconds, 1),
+        })
+    return result
+
+
+def start_server(workers: int) -> tuple:
+    """Serve main:app with uvicorn in a subprocess; returns (process, url)"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url + "/health").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("uvicorn did not start")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(url: str, concurrency: int, requests: int, only: list, rng: random.Random,
+              samples: dict, harness: list) -> dict:
+    results = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        for scenario in scenarios(rng, samples, harness, requests):
+            if only and not any(part in scenario.name for part in only):
+                continue
+            results[scenario.name] = await run_scenario(client, scenario, requests, concurrency)
+            stats = results[scenario.name]
+            print(f"  {scenario.name:<52} " + "  ".join(
+                f"{key}={stats[key]}" for key in ("p50_ms", "p95_ms", "p99_ms", "rps", "errors") if key in stats
+            ), flush=True)
+    return results
+
+
+def run_command(args) -> int:
+    rng = random.Random(args.seed)
+    cleanup()
+    samples = sample_ids(rng)
+    harness = create_harness_users(args.requests)
+    process = None
+    try:
+        url = args.url
+        if url is None:
+            process, url = start_server(args.workers)
+        started = datetime.now(timezone.utc)
+        routes = asyncio.run(run(url, args.concurrency, args.requests, args.only, rng, samples, harness))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        cleanup()
+
+    report = {
+        "meta": {
+            "started_at": started.isoformat(),
+            "commit": _git_commit(),
+            "url": args.url or f"uvicorn --workers {args.workers}",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "dataset": samples["dataset"],
+            "python": platform.python_version(),
+        },
+        "routes": routes,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"wrote {args.output}")
+    return 1 if any(stats["errors"] for stats in routes.values()) else 0
+
+
+def compare_command(args) -> int:
+    """Print per-route changes; exit 1 if any p95 got more than --threshold percent slower"""
+    with open(args.old) as old_file, open(args.new) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    regressed = False
+    for name, after in new["routes"].items():
+        before = old["routes"].get(name)
+        if not before or "p95_ms" not in before or "p95_ms" not in after:
+            print(f"  {name:<52} (no baseline)")
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key} {before[key]} -> {after[key]} ({change:+.0f}%)")
+        slower = before["p95_ms"] and (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 > args.threshold
+        regressed = regressed or bool(slower)
+        print(f"{'!' if slower else ' '} {name:<52} " + "  ".join(changes))
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test every API route")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the load test and write a report")
+    run_parser.add_argument("--url", help="server to test (default: start uvicorn in a subprocess)")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the server")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    run_parser.add_argument("--only", nargs="*", default=[], help="only routes whose name contains one of these")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", default="load-report.json")
+
+    compare_parser = commands.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10, help="allowed p95 slowdown in percent")
+
+    args = parser.parse_args()
+    return run_command(args) if args.command == "run" else compare_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
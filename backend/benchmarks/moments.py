@@ -0,0 +1,90 @@
+# moments.py - Enriched moments page vs. fetching each moment's event separately
+#
+# Usage (from backend/): python -m benchmarks.moments [moments] [attendees_per_event]
+import sys
+
+from sqlalchemy import text
+
+from benchmarks.common import client, count_statements, measure, report
+from database import engine
+
+BENCH_DOMAIN = "bench-moments.tum.de"
+
+
+def seed(total: int, attendees: int) -> str:
+    """One user with `total` moments, each on its own event with `attendees` participants"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO users (email, full_name)
+            SELECT 'user' || n || '@' || :domain, 'Bench User ' || n
+            FROM generate_series(0, :attendees) AS n
+            """
+        ), {"domain": BENCH_DOMAIN, "attendees": attendees})
+        user_id = conn.execute(text("SELECT id FROM users WHERE email = :email"),
+                               {"email": f"user0@{BENCH_DOMAIN}"}).scalar()
+        conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time)
+            SELECT :user_id, 'Bench event ' || n, 'bench-moments', 'Garching', now() - (n || ' days')::interval
+            FROM generate_series(1, :total) AS n
+            """
+        ), {"user_id": user_id, "total": total})
+        conn.execute(text(
+            """
+            INSERT INTO event_participants (event_id, user_id)
+            SELECT e.id, u.id FROM events e CROSS JOIN users u
+            WHERE e.category = 'bench-moments' AND u.email LIKE '%@' || :domain
+            """
+        ), {"domain": BENCH_DOMAIN})
+        conn.execute(text(
+            """
+            UPDATE events SET participant_count = :attendees + 1 WHERE category = 'bench-moments'
+            """
+        ), {"attendees": attendees})
+        conn.execute(text(
+            """
+            INSERT INTO moments (user_id, event_id, photo_url)
+            SELECT :user_id, id, 'https://example.com/' || id || '.jpg' FROM events WHERE category = 'bench-moments'
+            """
+        ), {"user_id": user_id})
+        conn.execute(text("ANALYZE"))
+    return str(user_id)
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": BENCH_DOMAIN})
+
+
+def main(total: int = 100, attendees: int = 20) -> None:
+    cleanup()
+    user_id = seed(total, attendees)
+    try:
+        params = {"user_id": user_id, "limit": total}
+
+        def enriched_page():
+            client.get("/api/moments", params=params).raise_for_status()
+
+        def page_then_events():
+            # What a client has to do without the enrichment
+            moments = client.get("/api/moments", params=params).json()
+            for moment in moments:
+                client.get(f"/api/events/{moment['event_id']}").raise_for_status()
+
+        report(f"GET /api/moments, {total} moments, {attendees + 1} attendees per event", {
+            "enriched page": {
+                "statements": count_statements(enriched_page),
+                **measure(enriched_page),
+            },
+            "page + event per moment": {
+                "statements": count_statements(page_then_events),
+                **measure(page_then_events, repeat=10, warmup=1),
+            },
+        })
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,73 @@
+# pagination.py - Offset vs keyset pagination latency on deep feed pages
+#
+# Usage (from backend/): python -m benchmarks.pagination [events] [page_size]
+import sys
+
+from sqlalchemy import text
+
+from benchmarks.common import client, measure, report
+from database import engine
+from main import _encode_cursor
+
+BENCH_CATEGORY = "bench-pagination"
+
+
+def seed(total: int) -> None:
+    """Insert `total` synthetic events owned by one throwaway user"""
+    with engine.begin() as conn:
+        creator_id = conn.execute(text(
+            "INSERT INTO users (email, full_name) VALUES ('bench-pagination@tum.de', 'Bench User') RETURNING id"
+        )).scalar()
+        conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time)
+            SELECT :creator_id, 'Bench event ' || n, :category, 'Garching',
+                   now() + (n || ' minutes')::interval
+            FROM generate_series(1, :total) AS n
+            """
+        ), {"creator_id": creator_id, "category": BENCH_CATEGORY, "total": total})
+        conn.execute(text("ANALYZE events"))
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email = 'bench-pagination@tum.de'"))
+
+
+def cursor_before(offset: int) -> str:
+    """Build the cursor a client would hold after reading `offset` rows"""
+    with engine.connect() as conn:
+        start_time, event_id = conn.execute(text(
+            """
+            SELECT start_time, id FROM events WHERE category = :category
+            ORDER BY start_time, id OFFSET :offset LIMIT 1
+            """
+        ), {"category": BENCH_CATEGORY, "offset": offset - 1}).one()
+    return _encode_cursor(start_time, event_id)
+
+
+def main(total: int = 60000, page_size: int = 100) -> None:
+    cleanup()
+    seed(total)
+    try:
+        deep_page = min(500, total // page_size)
+        deep_offset = (deep_page - 1) * page_size
+        params = {"category": BENCH_CATEGORY, "limit": page_size}
+        deep_cursor = cursor_before(deep_offset)
+
+        report(f"GET /api/events, {total} events, {page_size} per page", {
+            "offset page 1": measure(lambda: client.get("/api/events", params=params)),
+            f"offset page {deep_page}": measure(
+                lambda: client.get("/api/events", params={**params, "skip": deep_offset})
+            ),
+            "cursor page 1": measure(lambda: client.get("/api/events", params=params)),
+            f"cursor page {deep_page}": measure(
+                lambda: client.get("/api/events", params={**params, "cursor": deep_cursor})
+            ),
+        })
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
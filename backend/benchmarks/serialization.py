@@ -0,0 +1,103 @@
+# serialization.py - CPU cost of serializing a 100-event page
+#
+# Compares the list endpoints' pre-serialized orjson body with what FastAPI
+# does for a response_model (validate every row, then dump it), both in
+# isolation and per request. The event cache is disabled so every request
+# builds its page.
+#
+# Usage (from backend/): python -m benchmarks.serialization [events] [participants_per_event]
+import json
+import sys
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+import main as app_module
+from benchmarks.common import client, measure, report
+from cache import event_cache
+from database import engine
+from schemas import EventWithParticipants
+
+BENCH_CATEGORY = "bench-serialization"
+BENCH_DOMAIN = "bench-serialization.tum.de"
+
+
+def seed(total: int, participants: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO users (email, full_name, department)
+            SELECT 'user' || n || '@' || :domain, 'Bench User ' || n, 'BIE'
+            FROM generate_series(0, :participants) AS n
+            """
+        ), {"domain": BENCH_DOMAIN, "participants": participants})
+        conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, description, category, location, start_time, max_participants)
+            SELECT (SELECT id FROM users WHERE email = 'user0@' || :domain),
+                   'Bench event ' || n, repeat('Lorem ipsum dolor sit amet. ', 8), :category, 'Garching',
+                   now() + (n || ' minutes')::interval, 50
+            FROM generate_series(1, :total) AS n
+            """
+        ), {"domain": BENCH_DOMAIN, "category": BENCH_CATEGORY, "total": total})
+        conn.execute(text(
+            """
+            INSERT INTO event_participants (event_id, user_id)
+            SELECT e.id, u.id FROM events e CROSS JOIN users u
+            WHERE e.category = :category AND u.email LIKE '%@' || :domain
+            """
+        ), {"domain": BENCH_DOMAIN, "category": BENCH_CATEGORY})
+        conn.execute(text(
+            "UPDATE events SET participant_count = :participants + 1 WHERE category = :category"
+        ), {"participants": participants, "category": BENCH_CATEGORY})
+        conn.execute(text("ANALYZE"))
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": BENCH_DOMAIN})
+
+
+def main(total: int = 100, participants: int = 10) -> None:
+    cleanup()
+    seed(total, participants)
+    backend, event_cache.backend = event_cache.backend, None
+    try:
+        params = {"category": BENCH_CATEGORY, "limit": total}
+        payload = json.loads(client.get("/api/events", params=params).content)
+        adapter = TypeAdapter(List[EventWithParticipants])
+
+        report(f"Serializing {total} events in isolation (CPU)", {
+            "response_model validate+dump": measure(
+                lambda: adapter.dump_json(adapter.validate_python(payload)), timer=time.process_time
+            ),
+            "fast path (_json_body)": measure(lambda: app_module._json_body(payload), timer=time.process_time),
+        })
+
+        def request():
+            client.get("/api/events", params=params).raise_for_status()
+
+        after = measure(request, timer=time.process_time)
+
+        # Before: hand the dicts back to FastAPI so the response model validates
+        # and serializes them, as the endpoint used to
+        json_body, json_response = app_module._json_body, app_module._json_response
+        app_module._json_body, app_module._json_response = (lambda content: content), (lambda body, response: body)
+        try:
+            before = measure(request, timer=time.process_time)
+        finally:
+            app_module._json_body, app_module._json_response = json_body, json_response
+
+        report(f"GET /api/events, {total} events per page (CPU per request)", {
+            "before (response_model)": before,
+            "after (pre-serialized)": after,
+        })
+    finally:
+        event_cache.backend = backend
+        cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,145 @@
+# stream.py - Fan-out latency and memory with thousands of idle stream subscribers
+#
+# Opens `subscribers` connections to /api/stream/events through the ASGI app,
+# then has `messages` users join an event one after another and times each
+# join from the request until every subscriber has received its update. Fails
+# if the p95 fan-out time or the memory per subscriber is over budget.
+# The app is driven directly rather than through TestClient, so this measures the
+# server side only: no sockets, and no client parsing beyond finding the
+# event line.
+#
+# Usage (from backend/): python -m benchmarks.stream [subscribers] [messages] [max_p95_ms] [max_kib_per_subscriber]
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from benchmarks.common import client, peak_rss_mb
+from database import engine
+from main import app
+from realtime import event_hub
+
+BENCH_CATEGORY = "bench-stream"
+BENCH_DOMAIN = "bench-stream.tum.de"
+
+
+def seed(users: int) -> tuple:
+    """Create `users` users and one event; returns (event id, user ids)"""
+    with engine.begin() as conn:
+        user_ids = [str(user_id) for user_id, in conn.execute(text(
+            """
+            INSERT INTO users (email, full_name)
+            SELECT 'user' || n || '@' || :domain, 'Bench User ' || n FROM generate_series(1, :users) AS n
+            RETURNING id
+            """
+        ), {"domain": BENCH_DOMAIN, "users": users})]
+        event_id = conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time)
+            VALUES (:creator_id, 'Bench event', :category, 'Garching', now())
+            RETURNING id
+            """
+        ), {"creator_id": user_ids[0], "category": BENCH_CATEGORY}).scalar_one()
+    return str(event_id), user_ids
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": BENCH_DOMAIN})
+
+
+async def subscribe(received: list, delivered: asyncio.Event, total: int, disconnect: asyncio.Event) -> None:
+    """One idle client: counts participant_joined messages until told to disconnect"""
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and b"event: participant_joined" in message.get("body", b""):
+            received[0] += 1
+            if received[0] == total:
+                delivered.set()
+
+    path = "/api/stream/events"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 0), "server": ("testserver", 80), "root_path": "",
+    }
+    await app(scope, receive, send)
+
+
+async def run(subscribers: int, event_id: str, user_ids: list) -> dict:
+    loop = asyncio.get_running_loop()
+    disconnect = asyncio.Event()
+    baseline = peak_rss_mb()
+
+    received = [0]  # deliveries of the current message, shared by all subscribers
+    delivered = asyncio.Event()
+    tasks = [
+        asyncio.create_task(subscribe(received, delivered, subscribers, disconnect))
+        for _ in range(subscribers)
+    ]
+    while event_hub.stats()["subscribers"] < subscribers:
+        await asyncio.sleep(0.05)
+    # Let every stream send its retry line and settle into waiting
+    await asyncio.sleep(0.5)
+    kib_per_subscriber = (peak_rss_mb() - baseline) * 1024 / subscribers
+
+    fan_out_ms = []
+    for user_id in user_ids:
+        received[0] = 0
+        delivered.clear()
+        start = time.perf_counter()
+        response = await loop.run_in_executor(
+            None, lambda: client.post(f"/api/events/{event_id}/join", json={"event_id": event_id, "user_id": user_id})
+        )
+        assert response.status_code == 201, response.text
+        await asyncio.wait_for(delivered.wait(), 30)
+        fan_out_ms.append((time.perf_counter() - start) * 1000)
+
+    disconnect.set()
+    await asyncio.gather(*tasks)
+
+    fan_out_ms.sort()
+    return {
+        "kib_per_subscriber": round(kib_per_subscriber, 1),
+        "fan_out_p50_ms": round(statistics.median(fan_out_ms), 1),
+        "fan_out_p95_ms": round(fan_out_ms[max(int(len(fan_out_ms) * 0.95) - 1, 0)], 1),
+        "fan_out_max_ms": round(fan_out_ms[-1], 1),
+        "subscribers_left": event_hub.stats()["subscribers"],
+    }
+
+
+def main(subscribers: int = 5000, messages: int = 20, max_p95_ms: int = 1000,
+         max_kib_per_subscriber: int = 64) -> int:
+    cleanup()
+    event_id, user_ids = seed(messages + 1)
+    try:
+        # Warm up the app, pools and (in postgres mode) the listener
+        asyncio.run(run(1, event_id, user_ids[:1]))
+        result = asyncio.run(run(subscribers, event_id, user_ids[1:]))
+    finally:
+        cleanup()
+
+    print(f"{subscribers} idle subscribers, {messages} joins ({event_hub.stats()['backend']} backend)")
+    print("  " + "  ".join(f"{key}={value}" for key, value in result.items()))
+    print(f"budget: fan_out_p95_ms <= {max_p95_ms}, kib_per_subscriber <= {max_kib_per_subscriber}")
+    ok = (
+        result["fan_out_p95_ms"] <= max_p95_ms
+        and result["kib_per_subscriber"] <= max_kib_per_subscriber
+        and result["subscribers_left"] == 0
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
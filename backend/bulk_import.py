@@ -0,0 +1,235 @@
+# bulk_import.py - Load users, events and participations from CSV or NDJSON
+#
+# Rows are validated with the API's Pydantic schemas, streamed into a
+# temporary staging table with COPY and then upserted in one statement, all in
+# a single transaction: either the whole file is applied or none of it.
+#
+#   users         upserted on email
+#   events        upserted on id when the row has one, otherwise inserted;
+#                 rows whose creator does not exist are skipped
+#   participants  inserted unless already joined (capacity is not enforced);
+#                 participant_count is updated to match
+#
+# Afterwards the event list cache is invalidated. Run from the CLI, that only
+# reaches a running server when both use EVENT_CACHE_BACKEND=redis; with the
+# default in-memory cache the server keeps serving its cached pages until they
+# expire (EVENT_CACHE_TTL) or the server restarts.
+#
+# Usage (from backend/): python bulk_import.py {users,events,participants} FILE [--format csv|ndjson]
+# FILE may be - for stdin.
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from typing import Iterator, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+
+from cache import event_cache
+from database import engine
+from schemas import UserCreate, EventCreate, EventParticipantCreate
+
+CHUNK_SIZE = 10000  # rows per COPY
+MAX_REPORTED_ERRORS = 20
+
+
+class EventImport(EventCreate):
+    """EventCreate plus an optional id, so re-importing a file updates instead of duplicating"""
+    id: Optional[UUID] = None
+
+
+USERS_UPSERT = """
+    INSERT INTO users (email, full_name, profile_photo, department, bio)
+    SELECT DISTINCT ON (email) email, full_name, profile_photo, department, bio
+    FROM import_staging
+    ORDER BY email, line DESC
+    ON CONFLICT (email) DO UPDATE SET
+        full_name = EXCLUDED.full_name,
+        profile_photo = EXCLUDED.profile_photo,
+        department = EXCLUDED.department,
+        bio = EXCLUDED.bio,
+        updated_at = now()
+    RETURNING xmax = 0 AS inserted
+"""
+
+EVENTS_UPSERT = """
+    INSERT INTO events (id, creator_id, title, description, category, location, image_url,
+                        start_time, end_time, max_participants)
+    SELECT DISTINCT ON (coalesce(s.id, s.line::text))
+           coalesce(s.id::uuid, uuid_generate_v4()), u.id, s.title, s.description, s.category, s.location,
+           s.image_url, s.start_time::timestamptz, s.end_time::timestamptz, s.max_participants::integer
+    FROM import_staging s
+    JOIN users u ON u.id = s.creator_id::uuid
+    ORDER BY coalesce(s.id, s.line::text), s.line DESC
+    ON CONFLICT (id) DO UPDATE SET
+        creator_id = EXCLUDED.creator_id,
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        category = EXCLUDED.category,
+        location = EXCLUDED.location,
+        image_url = EXCLUDED.image_url,
+        start_time = EXCLUDED.start_time,
+        end_time = EXCLUDED.end_time,
+        max_participants = EXCLUDED.max_participants,
+        updated_at = now()
+    RETURNING xmax = 0 AS inserted
+"""
+
+PARTICIPANTS_UPSERT = """
+    WITH added AS (
+        INSERT INTO event_participants (event_id, user_id)
+        SELECT DISTINCT e.id, u.id
+        FROM import_staging s
+        JOIN events e ON e.id = s.event_id::uuid
+        JOIN users u ON u.id = s.user_id::uuid
+        ON CONFLICT (event_id, user_id) DO NOTHING
+        RETURNING event_id
+    ), counted AS (
+        UPDATE events SET participant_count = participant_count + added_count.n, updated_at = now()
+        FROM (SELECT event_id, count(*) AS n FROM added GROUP BY event_id) AS added_count
+        WHERE events.id = added_count.event_id
+    )
+    SELECT true AS inserted FROM added
+"""
+
+# kind -> (schema, staged columns, upsert statement)
+KINDS = {
+    "users": (UserCreate, ["email", "full_name", "profile_photo", "department", "bio"], USERS_UPSERT),
+    "events": (
+        EventImport,
+        ["id", "creator_id", "title", "description", "category", "location", "image_url",
+         "start_time", "end_time", "max_participants"],
+        EVENTS_UPSERT,
+    ),
+    "participants": (EventParticipantCreate, ["event_id", "user_id"], PARTICIPANTS_UPSERT),
+}
+
+
+def read_records(stream, file_format: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, raw record) from a CSV or NDJSON stream.
+
+    An NDJSON line that is not valid JSON yields its JSONDecodeError as the
+    record, so it is reported as an invalid row instead of aborting the import.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty CSV cells mean "not given"
+            yield reader.line_num, {key: value for key, value in record.items() if value != ""}
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield line_number, error
+
+
+def _copy_value(value) -> str:
+    """Encode one value for COPY's text format"""
+    if value is None:
+        return "\\N"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def _copy_chunk(cursor, columns: list, rows: list) -> None:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row) + "\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY import_staging (line, {', '.join(columns)}) FROM STDIN", buffer)
+
+
+def import_records(kind: str, records, errors: Optional[list] = None) -> dict:
+    """Validate, stage and upsert `records` ((line, dict) pairs) of one kind.
+
+    Invalid rows are skipped and described in `errors`; returns the counts
+    and throughput.
+    """
+    schema, columns, upsert = KINDS[kind]
+    errors = [] if errors is None else errors
+    start = time.perf_counter()
+    read = staged = 0
+
+    with engine.begin() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE import_staging (line integer, "
+            + ", ".join(f"{column} text" for column in columns)
+            + ") ON COMMIT DROP"
+        )
+
+        chunk = []
+        for line, record in records:
+            read += 1
+            if isinstance(record, json.JSONDecodeError):
+                errors.append((line, f"invalid JSON: {record}"))
+                continue
+            try:
+                values = schema.model_validate(record).model_dump(mode="json")
+            except ValidationError as error:
+                errors.append((line, str(error).replace("\n", " ")))
+                continue
+            chunk.append([line] + [values.get(column) for column in columns])
+            if len(chunk) >= CHUNK_SIZE:
+                _copy_chunk(cursor, columns, chunk)
+                staged += len(chunk)
+                chunk = []
+        if chunk:
+            _copy_chunk(cursor, columns, chunk)
+            staged += len(chunk)
+
+        cursor.execute("ANALYZE import_staging")
+        cursor.execute(upsert)
+        outcomes = [inserted for inserted, in cursor.fetchall()]
+
+    # Cached event pages embed events, counts and organizer names. Only reaches
+    # a server's cache if it is shared (Redis), see the top of this file
+    event_cache.invalidate_all()
+
+    seconds = time.perf_counter() - start
+    inserted = sum(1 for outcome in outcomes if outcome)
+    return {
+        "read": read,
+        "invalid": read - staged,
+        "inserted": inserted,
+        "updated": len(outcomes) - inserted,
+        "skipped": staged - len(outcomes),  # duplicates within the file, unknown references, existing joins
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(read / seconds) if seconds else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import users, events or participations")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("file", help="CSV or NDJSON file, - for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"],
+                        help="input format (default: from the file extension, csv for stdin)")
+    args = parser.parse_args()
+
+    file_format = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    stream = sys.stdin if args.file == "-" else open(args.file, newline="", encoding="utf-8")
+    errors = []
+    try:
+        result = import_records(args.kind, read_records(stream, file_format), errors)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for line, message in errors[:MAX_REPORTED_ERRORS]:
+        print(f"line {line}: {message}", file=sys.stderr)
+    if len(errors) > MAX_REPORTED_ERRORS:
+        print(f"... and {len(errors) - MAX_REPORTED_ERRORS} more invalid rows", file=sys.stderr)
+
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
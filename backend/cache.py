@@ -0,0 +1,228 @@
+# cache.py - Response cache for the event list endpoint
+#
+# Cached pages are tagged with the ids of the events they contain, so a
+# join/leave only drops the pages that show that event. Changes that can move
+# events between pages (create, update, delete) drop every page.
+#
+# Every invalidation also bumps a generation number. A handler reads it before
+# querying and passes it to set(), which drops the fill if an invalidation
+# happened meanwhile: the page may predate the write that caused it.
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from database import DB_ASYNC
+
+EVENT_CACHE_BACKEND = os.getenv("EVENT_CACHE_BACKEND", "memory")  # memory, redis or none
+EVENT_CACHE_TTL = int(os.getenv("EVENT_CACHE_TTL", 30))  # seconds
+EVENT_CACHE_MAX_ENTRIES = int(os.getenv("EVENT_CACHE_MAX_ENTRIES", 1024))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Tag carried by every entry, used to drop everything at once
+ALL_TAG = "*"
+
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL (one per worker process)"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key: str, value, tags: Iterable[str], generation: Optional[int] = None) -> None:
+        tags = set(tags) | {ALL_TAG}
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# KEYS: generation, entry, tag sets; ARGV: expected generation ("" = any), value, ttl
+_REDIS_SET_SCRIPT = """
+if ARGV[1] ~= '' and (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+for i = 3, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[2])
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+
+class RedisCache:
+    """Cache shared by all workers, on a Redis (or API-compatible) client.
+
+    Values are stored as JSON; each tag is a Redis set of the keys carrying it.
+    The generation check and the write run as one script, so they are atomic.
+
+    With DB_ASYNC, handlers run inside AsyncSession.run_sync on the event loop.
+    There the calls go through `async_client` (redis.asyncio) and are awaited
+    the same way SQLAlchemy awaits asyncpg, so they do not block the loop.
+    """
+
+    def __init__(self, client, ttl: int, prefix: str = "tumatch:events:", async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.generation_key = prefix + "generation"
+
+    def _call(self, command: str, *args, **kwargs):
+        if self.async_client is not None and in_greenlet():
+            result = getattr(self.async_client, command)(*args, **kwargs)
+            return await_only(result) if inspect.isawaitable(result) else result
+        return getattr(self.client, command)(*args, **kwargs)
+
+    def get(self, key: str):
+        raw = self._call("get", self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def generation(self) -> int:
+        return int(self._call("get", self.generation_key) or 0)
+
+    def set(self, key: str, value, tags: Iterable[str], generation: Optional[int] = None) -> None:
+        tag_keys = [self.prefix + "tag:" + tag for tag in set(tags) | {ALL_TAG}]
+        self._call(
+            "eval", _REDIS_SET_SCRIPT, 2 + len(tag_keys), self.generation_key, self.prefix + key, *tag_keys,
+            "" if generation is None else str(generation), json.dumps(jsonable_encoder(value)), self.ttl,
+        )
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        self._call("incr", self.generation_key)
+        tag_keys = [self.prefix + "tag:" + tag for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= {key.decode() if isinstance(key, bytes) else key for key in self._call("smembers", tag_key)}
+        if keys or tag_keys:
+            self._call("delete", *keys, *tag_keys)
+        return len(keys)
+
+
+class ResponseCache:
+    """Front for a cache backend that keeps hit/miss/invalidation counters"""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(*parts) -> str:
+        return json.dumps([str(part) if part is not None else None for part in parts])
+
+    def get(self, key: str):
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def generation(self) -> Optional[int]:
+        """Invalidations so far; read it before querying and pass it to set()"""
+        return None if self.backend is None else self.backend.generation()
+
+    def set(self, key: str, value, tags: Iterable[str] = (), generation: Optional[int] = None) -> None:
+        """Store a value, unless an invalidation happened since `generation` was read"""
+        if self.backend is not None:
+            self.backend.set(key, value, [str(tag) for tag in tags], generation)
+
+    def invalidate(self, *tags) -> None:
+        """Drop the entries carrying any of the given tags (event ids)"""
+        if self.backend is None or not tags:
+            return
+        dropped = self.backend.invalidate([str(tag) for tag in tags])
+        with self._lock:
+            self.invalidations += dropped
+
+    def invalidate_all(self) -> None:
+        self.invalidate(ALL_TAG)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+def _create_backend(name: Optional[str]):
+    if name == "memory":
+        return MemoryCache(EVENT_CACHE_MAX_ENTRIES, EVENT_CACHE_TTL)
+    if name == "redis":
+        # Imported lazily so the default setup does not need redis installed
+        import redis
+
+        async_client = None
+        if DB_ASYNC:
+            import redis.asyncio
+
+            async_client = redis.asyncio.Redis.from_url(REDIS_URL)
+        return RedisCache(redis.Redis.from_url(REDIS_URL), EVENT_CACHE_TTL, async_client=async_client)
+    return None
+
+
+event_cache = ResponseCache(_create_backend(EVENT_CACHE_BACKEND))
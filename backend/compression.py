@@ -0,0 +1,155 @@
+# compression.py - Brotli/gzip response compression
+#
+# Brotli is used when the client accepts it and the `brotli` package is
+# installed, gzip otherwise. Responses below COMPRESSION_MIN_SIZE, already
+# encoded responses and media that does not compress (images, event streams)
+# are passed through untouched.
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if encoding.strip()
+]  # in order of preference, empty disables compression
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))  # 1-9
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))  # 0-11
+
+# Only text-like bodies are worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/html", "text/plain", "text/csv")
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Encodings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip())
+    return accepted
+
+
+class Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk; non-final chunks are flushed so streamed rows reach the client"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _echo_weak_etag(headers: MutableHeaders, scope) -> None:
+    """On a 304, weaken the ETag if the client holds the weak (encoded) form, so its copy keeps its validator"""
+    etag = headers.get("etag")
+    if not etag or etag.startswith("W/"):
+        return
+    if_none_match = Headers(scope=scope).get("if-none-match", "")
+    if f"W/{etag}" in (tag.strip() for tag in if_none_match.split(",")):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses response bodies with the client's preferred encoding"""
+
+    def __init__(self, app, encodings=None, min_size: int = COMPRESSION_MIN_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        encodings = COMPRESSION_ENCODINGS if encodings is None else encodings
+        self.encodings = [encoding for encoding in encodings if encoding == "gzip" or (encoding == "br" and brotli)]
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, scope) -> Optional[str]:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        return next((encoding for encoding in self.encodings if encoding in accepted), None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+
+        start = None
+        compressor = None  # set once we decide to compress
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether to compress
+                start = message
+                headers = MutableHeaders(raw=message["headers"])
+                media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                negotiated = "content-encoding" not in headers and media_type in COMPRESSIBLE_TYPES
+                if message["status"] == 304:
+                    # No body or content type to go by; the full response is JSON
+                    headers.add_vary_header("Accept-Encoding")
+                    _echo_weak_etag(headers, scope)
+                    negotiated = False
+                elif negotiated:
+                    # Encoded or not, the body depends on Accept-Encoding
+                    headers.add_vary_header("Accept-Encoding")
+                passthrough = encoding is None or not negotiated
+                if passthrough:
+                    await send(start)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.min_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                # The encoded body differs from the identity one, so its ETag can only
+                # be weak (If-None-Match compares weakly)
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({**message, "body": body})
+                    return
+                await send(start)
+
+            await send({**message, "body": compressor.compress(body, final=not more_body)})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,41 +1,417 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import or_, and_, func, exists, literal, select, insert, update, delete, tuple_, false, true, case, Text, Uuid
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import List, Optional
 from uuid import UUID
+import asyncio
+import base64
+import hashlib
+import json
+import re
 import uvicorn
 
-from database import get_db, engine
+try:
+    import orjson
+except ImportError:  # optional; list endpoints fall back to the stdlib encoder
+    orjson = None
+
+from database import get_db, engine, pool_status, read_engine, pinned_to_primary, read_only
+from cache import event_cache
+import realtime
+from realtime import event_hub
+from compression import CompressionMiddleware, COMPRESSION_ENCODINGS
+import metrics
+from metrics import MetricsMiddleware, METRICS_ENABLED
+import profiler
+from profiler import SQLProfilerMiddleware, SQL_PROFILER
+from routing import DatabaseRoute
 from models import Base, User, Event, EventParticipant, Friendship, Moment
 from schemas import (
     UserCreate, UserResponse, UserWithEvents,
     EventCreate, EventResponse, EventWithParticipants,
     EventParticipantCreate, EventParticipantResponse,
     FriendshipCreate, FriendshipResponse,
-    MomentCreate, MomentResponse
+    MomentCreate, MomentResponse,
+    UserProfileBundle,
+    BatchGetRequest, UserBatchResponse, EventBatchResponse,
+    ParticipationBatchRequest, ParticipationBatchResponse
 )
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="TUMatch API", version="1.0.0")
+app.router.route_class = DatabaseRoute
 
-# CORS configuration
+# Response compression (configured through COMPRESSION_* env vars)
+if COMPRESSION_ENCODINGS:
+    app.add_middleware(CompressionMiddleware)
+
+# CORS configuration. allow_credentials (with explicit origins) lets the SPA's
+# credentialed fetches store and send the read-your-writes cookie (database.py)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Server-Timing"],
 )
 
+# Per-request SQL profiling, N+1 and slow query logs (configured through SQL_PROFILER* env vars)
+if SQL_PROFILER:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Prometheus metrics (outermost, so sizes are measured as sent)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# ============= Helpers =============
+
+# Number of participants shown on event cards in list views
+PARTICIPANT_PREVIEW_SIZE = 3
+
+
+def _parse_uuid(value: Optional[str]) -> Optional[UUID]:
+    """Parse an optional UUID query value, returning None if it is malformed"""
+    if not value:
+        return None
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+def _encode_cursor(sort_time: datetime, row_id: UUID) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    raw = json.dumps([sort_time.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by _encode_cursor, rejecting anything else"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_time, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_time), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _paginate(query, sort_columns, skip: int, limit: int, cursor: Optional[str], response: Response,
+              row_key, descending: bool = False, rank=None) -> list:
+    """Fetch one page ordered by (timestamp, id), by offset or by keyset.
+
+    With a cursor, the page starts right after the row the cursor points at
+    and `skip` is ignored, so deep pages cost the same as the first one. In
+    both modes a full page sets the X-Next-Cursor header for the next request.
+    Search results are ordered by `rank` first and only support offsets.
+    """
+    order = [column.desc() if descending else column.asc() for column in sort_columns]
+    if rank is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with search")
+        order.insert(0, rank.desc())
+    query = query.order_by(*order)
+
+    if cursor:
+        key = tuple_(*sort_columns)
+        after = _decode_cursor(cursor)
+        query = query.filter(key < after if descending else key > after)
+    else:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+
+    if rows and len(rows) == limit and rank is None:
+        response.headers["X-Next-Cursor"] = _encode_cursor(*row_key(rows[-1]))
+    return rows
+
+
+def _orjson_default(value):
+    # asyncpg (DB_ASYNC) returns its own uuid.UUID subclass, which orjson only accepts as an exact type
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_body(content) -> bytes:
+    """Serialize an already-shaped payload (dicts of UUIDs, datetimes, ...) to JSON.
+
+    Output matches what the response models produce, e.g. UTC as "Z".
+    """
+    with profiler.serializing():
+        if orjson is not None:
+            return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_UTC_Z)
+        return json.dumps(jsonable_encoder(content)).encode()
+
+
+def _ndjson_lines(rows) -> bytes:
+    """Serialize a batch of dicts as NDJSON lines in one pass (one profiler span, not one per row)"""
+    with profiler.serializing():
+        if orjson is not None:
+            dumps, option = orjson.dumps, orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
+            return b"".join([dumps(row, default=_orjson_default, option=option) for row in rows])
+        return "".join([json.dumps(row) + "\n" for row in jsonable_encoder(rows)]).encode()
+
+
+def _json_response(body, response: Response) -> Response:
+    """Return a pre-serialized body (bytes or str), keeping the headers already set on `response`.
+
+    Used by the hot list endpoints, whose rows are built from trusted query
+    results, so FastAPI does not validate and serialize them a second time
+    through the response model.
+    """
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag(*parts) -> str:
+    """Strong ETag over the values that determine a response body"""
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _http_date(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _is_fresh(request: Request, response: Response, etag: str, last_modified: Optional[str] = None) -> bool:
+    """Set the validators on the response and tell whether the client's copy is current.
+
+    If-None-Match takes precedence; If-Modified-Since is only used without it.
+    """
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = last_modified
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _not_modified(response: Response) -> Response:
+    """Empty 304 carrying the validators and Vary already set on `response`.
+
+    The middleware add their own Vary values (Accept-Encoding, Origin) on the way out.
+    """
+    headers = {
+        key: response.headers[key]
+        for key in ("ETag", "Last-Modified", "X-Next-Cursor", "Vary") if key in response.headers
+    }
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def _search_query(search: str):
+    """Turn free-text input into a prefix-matching tsquery, e.g. 'foot gar' -> 'foot:* & gar:*'"""
+    terms = re.findall(r"\w+", search.lower())
+    if not terms:
+        return None
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def _participant_info(user_id, full_name: str, profile_photo: Optional[str]) -> dict:
+    """Build the participant preview dict the frontend expects"""
+    return {
+        "user_id": str(user_id),
+        "name": full_name,
+        "photo": profile_photo or f"https://api.dicebear.com/7.x/avataaars/svg?seed={full_name}"
+    }
+
+
+def _joined_column(current_user_id: Optional[str]):
+    """EXISTS flag telling whether the current user joined the event"""
+    user_id = _parse_uuid(current_user_id)
+    if not user_id:
+        return literal(False).label("current_user_joined")
+
+    return exists().where(
+        EventParticipant.event_id == Event.id,
+        EventParticipant.user_id == user_id
+    ).correlate(Event).label("current_user_joined")
+
+
+def _participant_previews(db: Session, event_ids: List[UUID], per_event: Optional[int] = None) -> dict:
+    """Fetch participants with user info for a batch of events in one query.
+
+    If per_event is given, only the first `per_event` participants (by join
+    time) of each event are returned.
+    """
+    if not event_ids:
+        return {}
+
+    if per_event is None:
+        query = db.query(
+            EventParticipant.event_id, User.id, User.full_name, User.profile_photo
+        ).join(User, User.id == EventParticipant.user_id).filter(
+            EventParticipant.event_id.in_(event_ids)
+        ).order_by(EventParticipant.event_id, EventParticipant.joined_at, EventParticipant.id)
+    else:
+        # One index range scan (event_id, joined_at, id) per event, stopping after
+        # per_event rows, so the cost does not grow with how popular events are
+        first = select(
+            EventParticipant.user_id, EventParticipant.joined_at, EventParticipant.id
+        ).where(EventParticipant.event_id == Event.id).order_by(
+            EventParticipant.joined_at, EventParticipant.id
+        ).limit(per_event).lateral()
+        query = db.query(
+            Event.id, User.id, User.full_name, User.profile_photo
+        ).select_from(Event).join(first, true()).join(User, User.id == first.c.user_id).filter(
+            Event.id.in_(event_ids)
+        ).order_by(Event.id, first.c.joined_at, first.c.id)
+
+    previews = {}
+    for event_id, user_id, full_name, profile_photo in query:
+        previews.setdefault(event_id, []).append(_participant_info(user_id, full_name, profile_photo))
+    return previews
+
+
+def _has_free_seat():
+    """Condition on Event: unlimited (no or zero max_participants) or not yet full"""
+    return or_(
+        func.coalesce(Event.max_participants, 0) == 0,
+        Event.participant_count < Event.max_participants
+    )
+
+
+def _adjust_participant_count(db: Session, event_ids: List[UUID], delta: int) -> None:
+    """Atomically shift the denormalized participant counter of some events"""
+    if not event_ids:
+        return
+
+    db.query(Event).filter(Event.id.in_(event_ids)).update(
+        {Event.participant_count: Event.participant_count + delta, Event.updated_at: func.now()},
+        synchronize_session=False,
+    )
+
+
+def _publish_joined(db: Session, participant) -> None:
+    """Queue a participant_joined update (delivered on commit) from a joined row with the user's card"""
+    realtime.publish(db, {
+        "type": "participant_joined",
+        "event_id": str(participant["event_id"]),
+        "participant_count": participant["participant_count"],
+        "user": _participant_info(participant["user_id"], participant["full_name"], participant["profile_photo"]),
+    })
+
+
+def _publish_left(db: Session, event_id: UUID, participant_count: int, user_id: UUID) -> None:
+    """Queue a participant_left update (delivered on commit)"""
+    realtime.publish(db, {
+        "type": "participant_left",
+        "event_id": str(event_id),
+        "participant_count": participant_count,
+        "user_id": str(user_id),
+    })
+
+
+def _event_to_dict(event: Event, participants: List[dict]) -> dict:
+    """Serialize an event with organizer info (creator must already be loaded)"""
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "category": event.category,
+        "location": event.location,
+        "image_url": event.image_url,
+        "start_time": event.start_time,
+        "end_time": event.end_time,
+        "max_participants": event.max_participants,
+        "status": event.status,
+        "creator_id": event.creator_id,
+        "created_at": event.created_at,
+        "participant_count": event.participant_count,
+        "participants": participants,
+        "organizer_id": event.creator_id,
+        "organizer_name": event.creator.full_name if event.creator else None,
+        "organizer_photo": event.creator.profile_photo if event.creator else None,
+        "organizer_department": event.creator.department if event.creator else None,
+    }
+
+
+def _with_event_info(moment_query):
+    """Add the moment's event title, location and date to a Moment query (one join)"""
+    return moment_query.join(Event, Event.id == Moment.event_id).add_columns(
+        Event.title, Event.location, Event.start_time
+    )
+
+
+def _moments_to_dicts(db: Session, rows) -> List[dict]:
+    """Serialize (moment, title, location, start_time) rows with attendee previews.
+
+    Attendees are fetched for all of the moments' events in one query.
+    """
+    previews = _participant_previews(
+        db, list({moment.event_id for moment, *_ in rows}), per_event=PARTICIPANT_PREVIEW_SIZE
+    )
+    return [
+        {
+            "id": moment.id,
+            "user_id": moment.user_id,
+            "event_id": moment.event_id,
+            "photo_url": moment.photo_url,
+            "caption": moment.caption,
+            "created_at": moment.created_at,
+            "event_title": event_title,
+            "location": location,
+            "event_date": event_date,
+            "attendees": previews.get(moment.event_id, []),
+        }
+        for moment, event_title, location, event_date in rows
+    ]
+
 # ============= Health Check =============
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/pool")
+def pool_health():
+    """Connection pool occupancy and checkout/wait metrics"""
+    return pool_status()
+
+@app.get("/health/cache")
+def cache_health():
+    """Event list cache hit/miss counters"""
+    return event_cache.stats()
+
+@app.get("/health/realtime")
+def realtime_health():
+    """Connected stream subscribers and listener state"""
+    return event_hub.stats()
+
+@app.get("/health/profiler")
+def profiler_health():
+    """Recent requests the SQL profiler flagged for N+1 patterns or slow queries"""
+    return {"enabled": SQL_PROFILER, "requests": profiler.recent_reports()}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Request, SQL and connection pool metrics in the Prometheus text format (METRICS_ENABLED only)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # ============= User Endpoints =============
 
 @app.post("/api/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -54,34 +430,126 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 @app.get("/api/users", response_model=List[UserResponse])
 def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all users with optional search"""
     query = db.query(User)
 
+    rank = None
     if search:
-        query = query.filter(
-            or_(
-                User.name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.department.ilike(f"%{search}%")
-            )
-        )
-
-    users = query.offset(skip).limit(limit).all()
+        ts_query = _search_query(search)
+        if ts_query is None:
+            # Nothing searchable (e.g. only punctuation) matches nothing
+            query = query.filter(false())
+        else:
+            query = query.filter(User.search_vector.op("@@")(ts_query))
+            rank = func.ts_rank(User.search_vector, ts_query)
+
+    users = _paginate(
+        query, (User.created_at, User.id), skip, limit, cursor, response,
+        row_key=lambda user: (user.created_at, user.id), rank=rank
+    )
     return users
 
 @app.get("/api/users/{user_id}", response_model=UserWithEvents)
-def get_user(user_id: UUID, db: Session = Depends(get_db)):
+def get_user(user_id: UUID, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get a specific user with their events"""
+    # Check the client's validators against the row version before loading the row
+    updated_at = db.query(User.updated_at).filter(User.id == user_id).scalar()
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if _is_fresh(request, response, _etag("user", user_id, updated_at), _http_date(updated_at)):
+        return _not_modified(response)
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@app.get("/api/users/{user_id}/profile", response_model=UserProfileBundle)
+def get_user_profile(
+    user_id: UUID,
+    events_limit: int = 100,
+    moments_limit: int = 100,
+    viewer_id: Optional[UUID] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a user's profile page data (user, events, friends, moments) in six queries.
+
+    With viewer_id, also the viewer's friendship with this user (any status),
+    which the profile's friend button needs.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    created_events = db.query(Event).filter(Event.creator_id == user_id).order_by(
+        Event.start_time.desc(), Event.id
+    ).limit(events_limit).all()
+    for event in created_events:
+        # The organizer is the user loaded above; skip the lazy load
+        set_committed_value(event, "creator", user)
+
+    joined_events = db.query(Event).join(
+        EventParticipant, EventParticipant.event_id == Event.id
+    ).filter(EventParticipant.user_id == user_id).options(joinedload(Event.creator)).order_by(
+        Event.start_time.desc(), Event.id
+    ).limit(events_limit).all()
+
+    # The friend is whichever side of the friendship is not this user
+    friend_id = case((Friendship.user_id == user_id, Friendship.friend_id), else_=Friendship.user_id)
+    wanted = Friendship.status == "accepted"
+    if viewer_id is not None:
+        wanted = or_(wanted, friend_id == viewer_id)
+    friendships = db.query(Friendship, User.id, User.full_name, User.profile_photo, User.department).join(
+        User, User.id == friend_id
+    ).filter(
+        or_(Friendship.user_id == user_id, Friendship.friend_id == user_id),
+        wanted
+    ).order_by(User.full_name).all()
+    viewer_friendship = next(
+        (friendship for friendship, friend_user_id, *_ in friendships if friend_user_id == viewer_id), None
+    )
+
+    moments = _with_event_info(db.query(Moment)).filter(Moment.user_id == user_id).order_by(
+        Moment.created_at.desc(), Moment.id.desc()
+    ).limit(moments_limit).all()
+
+    return {
+        "user": user,
+        "created_events": [_event_to_dict(event, []) for event in created_events],
+        "joined_events": [_event_to_dict(event, []) for event in joined_events],
+        "friends": [
+            {
+                "friendship_id": friendship.id,
+                "user_id": friend_user_id,
+                "full_name": full_name,
+                "profile_photo": profile_photo,
+                "department": department,
+            }
+            for friendship, friend_user_id, full_name, profile_photo, department in friendships
+            if friendship.status == "accepted"
+        ],
+        "moments": _moments_to_dicts(db, moments),
+        "viewer_friendship": viewer_friendship,
+    }
+
+@app.post("/api/users:batchGet", response_model=UserBatchResponse)
+@read_only
+def batch_get_users(batch: BatchGetRequest, db: Session = Depends(get_db)):
+    """Get several users by id in one query"""
+    ids = list(dict.fromkeys(batch.ids))
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(ids))} if ids else {}
+    return {
+        "items": [users[user_id] for user_id in ids if user_id in users],
+        "missing": [user_id for user_id in ids if user_id not in users],
+    }
+
 @app.patch("/api/users/{user_id}", response_model=UserResponse)
 def update_user(user_id: UUID, user_update: UserCreate, db: Session = Depends(get_db)):
     """Update a user"""
@@ -93,6 +561,8 @@ def update_user(user_id: UUID, user_update: UserCreate, db: Session = Depends(ge
         setattr(db_user, key, value)
 
     db.commit()
+    # Names and photos appear in cached event lists
+    event_cache.invalidate_all()
     db.refresh(db_user)
     return db_user
 
@@ -103,8 +573,15 @@ def delete_user(user_id: UUID, db: Session = Depends(get_db)):
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # The user's participations cascade away, so release their seats first
+    joined_event_ids = [
+        event_id for (event_id,) in db.query(EventParticipant.event_id).filter(EventParticipant.user_id == user_id)
+    ]
+    _adjust_participant_count(db, joined_event_ids, -1)
+
     db.delete(db_user)
     db.commit()
+    event_cache.invalidate_all()
     return None
 
 # ============= Event Endpoints =============
@@ -119,14 +596,20 @@ def create_event(event: EventCreate, db: Session = Depends(get_db)):
 
     db_event = Event(**event.model_dump())
     db.add(db_event)
+    db.flush()
+    realtime.publish(db, {"type": "event_created", "event_id": str(db_event.id), "creator_id": str(db_event.creator_id)})
     db.commit()
+    event_cache.invalidate_all()
     db.refresh(db_event)
     return db_event
 
 @app.get("/api/events", response_model=List[EventWithParticipants])
 def get_events(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
     creator_id: Optional[UUID] = None,
@@ -134,6 +617,17 @@ def get_events(
     db: Session = Depends(get_db)
 ):
     """Get all events with filters"""
+    cache_key = event_cache.key("events", category, search, creator_id, current_user_id, skip, limit, cursor)
+    # A client that just wrote must see its write, which a cached page may predate
+    cached = None if pinned_to_primary(request) else event_cache.get(cache_key)
+    if cached is not None:
+        if cached["next_cursor"]:
+            response.headers["X-Next-Cursor"] = cached["next_cursor"]
+        if _is_fresh(request, response, cached["etag"]):
+            return _not_modified(response)
+        return _json_response(cached["body"], response)
+
+    cache_generation = event_cache.generation()
     query = db.query(Event)
 
     if category:
@@ -142,95 +636,102 @@ def get_events(
     if creator_id:
         query = query.filter(Event.creator_id == creator_id)
 
+    rank = None
     if search:
-        query = query.filter(
-            or_(
-                Event.title.ilike(f"%{search}%"),
-                Event.description.ilike(f"%{search}%"),
-                Event.location.ilike(f"%{search}%")
-            )
-        )
+        ts_query = _search_query(search)
+        if ts_query is None:
+            # Nothing searchable (e.g. only punctuation) matches nothing
+            query = query.filter(false())
+        else:
+            query = query.filter(Event.search_vector.op("@@")(ts_query))
+            rank = func.ts_rank(Event.search_vector, ts_query)
+
+    def page(page_query, row_key):
+        return _paginate(page_query, (Event.start_time, Event.id), skip, limit, cursor, response, row_key, rank=rank)
+
+    # Validate against the page's row versions (plus the newest user change,
+    # since organizer and participant names are embedded) before loading rows.
+    # No Last-Modified: deleting an event removes it from the page without
+    # moving any remaining timestamp forward, while the ETag's id list changes.
+    versions = page(
+        query.with_entities(
+            Event.id, Event.start_time, Event.updated_at,
+            select(func.max(User.updated_at)).scalar_subquery().label("users_updated_at")
+        ),
+        lambda row: (row.start_time, row.id)
+    )
+    etag = _etag("events", cache_key, [(row.id, row.updated_at) for row in versions],
+                 versions[0].users_updated_at if versions else None)
+    if _is_fresh(request, response, etag):
+        return _not_modified(response)
+
+    rows = page(
+        query.add_columns(_joined_column(current_user_id)).options(joinedload(Event.creator)),
+        lambda row: (row[0].start_time, row[0].id)
+    )
 
-    events = query.offset(skip).limit(limit).all()
+    # Previews are fetched for the whole page at once
+    previews = _participant_previews(db, [event.id for event, _ in rows], per_event=PARTICIPANT_PREVIEW_SIZE)
 
-    # Populate participant_count and organizer info for each event
     result = []
-    for event in events:
-        # Get first 3 participants with their user info
-        participants_data = []
-        for participant in event.participants[:3]:  # Only get first 3 for preview
-            if participant.user:
-                participants_data.append({
-                    "user_id": str(participant.user_id),
-                    "name": participant.user.full_name,
-                    "photo": participant.user.profile_photo or f"https://api.dicebear.com/7.x/avataaars/svg?seed={participant.user.full_name}"
-                })
-
-        event_dict = {
-            "id": event.id,
-            "title": event.title,
-            "description": event.description,
-            "category": event.category,
-            "location": event.location,
-            "image_url": event.image_url,
-            "start_time": event.start_time,
-            "end_time": event.end_time,
-            "max_participants": event.max_participants,
-            "status": event.status,
-            "creator_id": event.creator_id,
-            "created_at": event.created_at,
-            "participant_count": len(event.participants),
-            "participants": participants_data,  # Add participant preview
-            "organizer_id": event.creator_id,
-            "organizer_name": event.creator.full_name if event.creator else None,
-            "organizer_photo": event.creator.profile_photo if event.creator else None,
-            "organizer_department": event.creator.department if event.creator else None,
-            "current_user_joined": any(str(p.user_id) == current_user_id for p in event.participants) if current_user_id else False,
-        }
+    for event, joined in rows:
+        event_dict = _event_to_dict(event, previews.get(event.id, []))
+        event_dict["current_user_joined"] = bool(joined)
         result.append(event_dict)
 
-    return result
+    body = _json_body(result)
+
+    # Tagged with the page's event ids so a join/leave only drops pages showing that event.
+    # Only primary reads are cached: a lagging replica could put back a page a write just invalidated.
+    if db.info.get("reads_primary"):
+        event_cache.set(
+            cache_key,
+            {
+                "body": body,
+                "next_cursor": response.headers.get("X-Next-Cursor"),
+                "etag": etag,
+            },
+            tags=[event.id for event, _ in rows],
+            generation=cache_generation,
+        )
+    return _json_response(body, response)
 
 @app.get("/api/events/{event_id}", response_model=EventWithParticipants)
 def get_event(event_id: UUID, db: Session = Depends(get_db)):
     """Get a specific event with participants"""
-    event = db.query(Event).filter(Event.id == event_id).first()
+    event = db.query(Event).options(joinedload(Event.creator)).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Get all participants with their user info for detail view
-    participants_data = []
-    for participant in event.participants:
-        if participant.user:
-            participants_data.append({
-                "user_id": str(participant.user_id),
-                "name": participant.user.full_name,
-                "photo": participant.user.profile_photo or f"https://api.dicebear.com/7.x/avataaars/svg?seed={participant.user.full_name}"
-            })
-
-    # Populate participant_count and organizer info
-    event_dict = {
-        "id": event.id,
-        "title": event.title,
-        "description": event.description,
-        "category": event.category,
-        "location": event.location,
-        "image_url": event.image_url,
-        "start_time": event.start_time,
-        "end_time": event.end_time,
-        "max_participants": event.max_participants,
-        "status": event.status,
-        "creator_id": event.creator_id,
-        "created_at": event.created_at,
-        "participant_count": len(event.participants),
-        "participants": participants_data,  # Include all participants for detail view
-        "organizer_id": event.creator_id,
-        "organizer_name": event.creator.full_name if event.creator else None,
-        "organizer_photo": event.creator.profile_photo if event.creator else None,
-        "organizer_department": event.creator.department if event.creator else None,
-    }
+    # Include all participants for detail view
+    participants_data = _participant_previews(db, [event.id]).get(event.id, [])
 
-    return event_dict
+    return _event_to_dict(event, participants_data)
+
+@app.post("/api/events:batchGet", response_model=EventBatchResponse)
+@read_only
+def batch_get_events(
+    batch: BatchGetRequest,
+    current_user_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get several events by id, with participant previews, in two queries"""
+    ids = list(dict.fromkeys(batch.ids))
+    rows = db.query(Event).add_columns(_joined_column(current_user_id)).options(
+        joinedload(Event.creator)
+    ).filter(Event.id.in_(ids)).all() if ids else []
+    previews = _participant_previews(db, [event.id for event, _ in rows], per_event=PARTICIPANT_PREVIEW_SIZE)
+
+    events = {}
+    for event, joined in rows:
+        event_dict = _event_to_dict(event, previews.get(event.id, []))
+        event_dict["current_user_joined"] = bool(joined)
+        events[event.id] = event_dict
+
+    return {
+        "items": [events[event_id] for event_id in ids if event_id in events],
+        "missing": [event_id for event_id in ids if event_id not in events],
+    }
 
 @app.patch("/api/events/{event_id}", response_model=EventResponse)
 def update_event(event_id: UUID, event_update: EventCreate, db: Session = Depends(get_db)):
@@ -243,6 +744,8 @@ def update_event(event_id: UUID, event_update: EventCreate, db: Session = Depend
         setattr(db_event, key, value)
 
     db.commit()
+    # Filters, search matches and ordering may have changed
+    event_cache.invalidate_all()
     db.refresh(db_event)
     return db_event
 
@@ -254,7 +757,9 @@ def delete_event(event_id: UUID, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Event not found")
 
     db.delete(db_event)
+    realtime.publish(db, {"type": "event_deleted", "event_id": str(event_id)})
     db.commit()
+    event_cache.invalidate_all()
     return None
 
 # ============= Event Participant Endpoints =============
@@ -262,17 +767,55 @@ def delete_event(event_id: UUID, db: Session = Depends(get_db)):
 @app.post("/api/events/{event_id}/join", response_model=EventParticipantResponse, status_code=status.HTTP_201_CREATED)
 def join_event(event_id: UUID, participant: EventParticipantCreate, db: Session = Depends(get_db)):
     """Join an event"""
-    # Verify event exists
+    # Take a seat and record the participation in a single statement. The
+    # UPDATE locks the event row, so concurrent joins re-check capacity in turn.
+    seat = update(Event).where(
+        Event.id == event_id,
+        _has_free_seat(),
+        exists().where(User.id == participant.user_id),
+        ~exists().where(
+            and_(
+                EventParticipant.event_id == event_id,
+                EventParticipant.user_id == participant.user_id
+            )
+        )
+    ).values(
+        participant_count=Event.participant_count + 1, updated_at=func.now()
+    ).returning(Event.id, Event.participant_count).cte("seat")
+
+    joined = insert(EventParticipant).from_select(
+        ["event_id", "user_id"],
+        select(seat.c.id, literal(participant.user_id, EventParticipant.user_id.type))
+    ).returning(*EventParticipant.__table__.c).cte("joined")
+
+    # Also return the new count and the user's card for the realtime update
+    stmt = select(joined, seat.c.participant_count, User.full_name, User.profile_photo).join(
+        seat, seat.c.id == joined.c.event_id
+    ).join(User, User.id == joined.c.user_id)
+
+    try:
+        db_participant = db.execute(stmt).mappings().first()
+        if db_participant:
+            _publish_joined(db, db_participant)
+        db.commit()
+    except IntegrityError:
+        # A concurrent request for the same user won the unique constraint
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already joined this event")
+
+    if db_participant:
+        event_cache.invalidate(event_id)
+        return db_participant
+
+    # Nothing was inserted; work out why
     event = db.query(Event).filter(Event.id == event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Verify user exists
     user = db.query(User).filter(User.id == participant.user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Check if already joined
     existing = db.query(EventParticipant).filter(
         and_(
             EventParticipant.event_id == event_id,
@@ -282,38 +825,145 @@ def join_event(event_id: UUID, participant: EventParticipantCreate, db: Session
     if existing:
         raise HTTPException(status_code=400, detail="Already joined this event")
 
-    # Check max participants
-    if event.max_participants:
-        current_count = db.query(EventParticipant).filter(
-            EventParticipant.event_id == event_id
-        ).count()
-        if current_count >= event.max_participants:
-            raise HTTPException(status_code=400, detail="Event is full")
-
-    # Create participant with event_id from URL path
-    db_participant = EventParticipant(event_id=event_id, user_id=participant.user_id)
-    db.add(db_participant)
-    db.commit()
-    db.refresh(db_participant)
-    return db_participant
+    raise HTTPException(status_code=400, detail="Event is full")
 
 @app.delete("/api/events/{event_id}/leave/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def leave_event(event_id: UUID, user_id: UUID, db: Session = Depends(get_db)):
     """Leave an event"""
-    participant = db.query(EventParticipant).filter(
+    # Delete the participation and release its seat in a single statement
+    gone = delete(EventParticipant).where(
         and_(
             EventParticipant.event_id == event_id,
             EventParticipant.user_id == user_id
         )
-    ).first()
+    ).returning(EventParticipant.event_id).cte("gone")
+
+    stmt = update(Event).where(
+        Event.id.in_(select(gone.c.event_id))
+    ).values(
+        participant_count=Event.participant_count - 1, updated_at=func.now()
+    ).returning(Event.id, Event.participant_count).execution_options(
+        synchronize_session=False
+    )
 
-    if not participant:
+    released = db.execute(stmt).first()
+    if not released:
         raise HTTPException(status_code=404, detail="Participant not found")
 
-    db.delete(participant)
+    _publish_left(db, released.id, released.participant_count, user_id)
     db.commit()
+    event_cache.invalidate(event_id)
     return None
 
+@app.post("/api/users/{user_id}/participations:batch", response_model=ParticipationBatchResponse)
+def batch_participations(user_id: UUID, batch: ParticipationBatchRequest, db: Session = Depends(get_db)):
+    """Join and leave several events in one transaction, with a result per event.
+
+    Items fail independently: a full or missing event does not stop the
+    others. Each result carries the status code join_event/leave_event would
+    have returned.
+    """
+    join_ids = list(dict.fromkeys(batch.join))
+    leave_ids = list(dict.fromkeys(batch.leave))
+    if set(join_ids) & set(leave_ids):
+        raise HTTPException(status_code=400, detail="Cannot join and leave the same event")
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    joined, left = set(), set()
+
+    if join_ids:
+        # Same seat-taking statement as join_event, for all events at once
+        seats = update(Event).where(
+            Event.id.in_(join_ids),
+            _has_free_seat(),
+            ~exists().where(
+                and_(
+                    EventParticipant.event_id == Event.id,
+                    EventParticipant.user_id == user_id
+                )
+            )
+        ).values(
+            participant_count=Event.participant_count + 1, updated_at=func.now()
+        ).returning(Event.id, Event.participant_count).cte("seats")
+
+        inserted = insert(EventParticipant).from_select(
+            ["event_id", "user_id"],
+            select(seats.c.id, literal(user_id, EventParticipant.user_id.type))
+        ).returning(EventParticipant.event_id, EventParticipant.user_id).cte("inserted")
+
+        stmt = select(inserted, seats.c.participant_count).join(seats, seats.c.id == inserted.c.event_id)
+
+        try:
+            for row in db.execute(stmt).mappings():
+                joined.add(row["event_id"])
+                _publish_joined(db, {**row, "full_name": user.full_name, "profile_photo": user.profile_photo})
+        except IntegrityError:
+            # A concurrent request for the same user won the unique constraint
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Already joined one of these events")
+
+    if leave_ids:
+        gone = delete(EventParticipant).where(
+            EventParticipant.event_id.in_(leave_ids),
+            EventParticipant.user_id == user_id
+        ).returning(EventParticipant.event_id).cte("gone")
+
+        stmt = update(Event).where(
+            Event.id.in_(select(gone.c.event_id))
+        ).values(
+            participant_count=Event.participant_count - 1, updated_at=func.now()
+        ).returning(Event.id, Event.participant_count).execution_options(
+            synchronize_session=False
+        )
+        for event_id, participant_count in db.execute(stmt):
+            left.add(event_id)
+            _publish_left(db, event_id, participant_count, user_id)
+
+    # Work out why the remaining items did nothing, in one query
+    failed_ids = [event_id for event_id in join_ids if event_id not in joined]
+    failed_ids += [event_id for event_id in leave_ids if event_id not in left]
+    already_joined = {}
+    if failed_ids:
+        already_joined = dict(db.query(
+            Event.id,
+            exists().where(
+                and_(
+                    EventParticipant.event_id == Event.id,
+                    EventParticipant.user_id == user_id
+                )
+            )
+        ).filter(Event.id.in_(failed_ids)).all())
+
+    db.commit()
+    if joined or left:
+        event_cache.invalidate(*joined, *left)
+
+    results = []
+    for event_id in join_ids:
+        if event_id in joined:
+            result = (status.HTTP_201_CREATED, None)
+        elif event_id not in already_joined:
+            result = (status.HTTP_404_NOT_FOUND, "Event not found")
+        elif already_joined[event_id]:
+            result = (status.HTTP_400_BAD_REQUEST, "Already joined this event")
+        else:
+            result = (status.HTTP_400_BAD_REQUEST, "Event is full")
+        results.append({"event_id": event_id, "action": "join", "status": result[0], "detail": result[1]})
+
+    for event_id in leave_ids:
+        if event_id in left:
+            result = (status.HTTP_204_NO_CONTENT, None)
+        elif event_id not in already_joined:
+            result = (status.HTTP_404_NOT_FOUND, "Event not found")
+        else:
+            result = (status.HTTP_404_NOT_FOUND, "Participant not found")
+        results.append({"event_id": event_id, "action": "leave", "status": result[0], "detail": result[1]})
+
+    return {"results": results}
+
 @app.get("/api/events/{event_id}/participants", response_model=List[EventParticipantResponse])
 def get_event_participants(event_id: UUID, db: Session = Depends(get_db)):
     """Get all participants for an event"""
@@ -367,12 +1017,16 @@ def get_user_friendships(
     status_filter: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all friendships for a user"""
+    """Get all friendships for a user, with the other user's name and photo"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    query = db.query(Friendship).filter(
+    # The friend is whichever side of the friendship is not this user
+    friend_id = case((Friendship.user_id == user_id, Friendship.friend_id), else_=Friendship.user_id)
+    query = db.query(Friendship, User.full_name, User.profile_photo).join(
+        User, User.id == friend_id
+    ).filter(
         or_(
             Friendship.user_id == user_id,
             Friendship.friend_id == user_id
@@ -382,7 +1036,12 @@ def get_user_friendships(
     if status_filter:
         query = query.filter(Friendship.status == status_filter)
 
-    friendships = query.all()
+    friendships = []
+    for friendship, friend_name, friend_photo in query.all():
+        friendship_dict = FriendshipResponse.model_validate(friendship).model_dump()
+        friendship_dict["friend_name"] = friend_name
+        friendship_dict["friend_photo"] = friend_photo
+        friendships.append(friendship_dict)
     return friendships
 
 @app.patch("/api/friendships/{friendship_id}", response_model=FriendshipResponse)
@@ -437,10 +1096,13 @@ def create_moment(moment: MomentCreate, db: Session = Depends(get_db)):
 
 @app.get("/api/moments", response_model=List[MomentResponse])
 def get_moments(
+    request: Request,
+    response: Response,
     user_id: Optional[UUID] = None,
     event_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get moments with filters"""
@@ -452,16 +1114,37 @@ def get_moments(
     if event_id:
         query = query.filter(Moment.event_id == event_id)
 
-    moments = query.order_by(Moment.created_at.desc()).offset(skip).limit(limit).all()
-    return moments
+    def page(page_query, row_key):
+        # Newest first
+        return _paginate(
+            page_query, (Moment.created_at, Moment.id), skip, limit, cursor, response, row_key, descending=True
+        )
+
+    # The body embeds event details and attendee names, so their versions count too.
+    # ETag only, like the event list: a delete does not move any Last-Modified forward.
+    versions = page(
+        query.join(Event, Event.id == Moment.event_id).with_entities(
+            Moment.id, Moment.created_at, Moment.updated_at, Event.updated_at.label("event_updated_at"),
+            select(func.max(User.updated_at)).scalar_subquery().label("users_updated_at")
+        ),
+        lambda row: (row.created_at, row.id)
+    )
+    etag = _etag("moments", str(request.query_params),
+                 [(row.id, row.updated_at, row.event_updated_at) for row in versions],
+                 versions[0].users_updated_at if versions else None)
+    if _is_fresh(request, response, etag):
+        return _not_modified(response)
+
+    rows = page(_with_event_info(query), lambda row: (row[0].created_at, row[0].id))
+    return _json_response(_json_body(_moments_to_dicts(db, rows)), response)
 
 @app.get("/api/moments/{moment_id}", response_model=MomentResponse)
 def get_moment(moment_id: UUID, db: Session = Depends(get_db)):
     """Get a specific moment"""
-    moment = db.query(Moment).filter(Moment.id == moment_id).first()
-    if not moment:
+    row = _with_event_info(db.query(Moment)).filter(Moment.id == moment_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Moment not found")
-    return moment
+    return _moments_to_dicts(db, [row])[0]
 
 @app.delete("/api/moments/{moment_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_moment(moment_id: UUID, db: Session = Depends(get_db)):
@@ -474,6 +1157,89 @@ def delete_moment(moment_id: UUID, db: Session = Depends(get_db)):
     db.commit()
     return None
 
+# ============= Stream Endpoints =============
+
+# Comment line sent on idle streams so proxies keep the connection open
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+@app.get("/api/stream/events")
+async def stream_events(event_id: Optional[str] = None):
+    """Server-sent events with participant and event changes.
+
+    Pass event_id (comma-separated) to only receive updates for those events.
+    A "resync" message means updates were missed and the client should refetch.
+    """
+    event_ids = [str(parsed) for parsed in map(_parse_uuid, (event_id or "").split(",")) if parsed]
+    subscription = event_hub.subscribe(event_ids)
+
+    async def messages():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ============= Export Endpoints =============
+
+# Rows fetched from the server-side cursor (and written) per chunk
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_ndjson(table, filename: str) -> StreamingResponse:
+    """Stream every row of a table as NDJSON.
+
+    Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE, so
+    memory use does not depend on the table size. The generator holds its
+    own connection because it outlives the request's dependencies.
+    """
+    # UUIDs are sent as Postgres renders them: building uuid.UUID objects only
+    # to turn them back into strings cost more than the JSON encoding
+    columns = [
+        column.cast(Text).label(column.key) if isinstance(column.type, Uuid) else column
+        for column in table.c if column.key != "search_vector"
+    ]
+
+    def rows():
+        with read_engine().connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(
+                select(*columns)
+            )
+            keys = list(result.keys())
+            for batch in result.partitions():
+                yield _ndjson_lines([dict(zip(keys, row)) for row in batch])
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/api/export/events.ndjson")
+def export_events():
+    """Export all events as NDJSON"""
+    return _export_ndjson(Event.__table__, "events.ndjson")
+
+@app.get("/api/export/moments.ndjson")
+def export_moments():
+    """Export all moments as NDJSON"""
+    return _export_ndjson(Moment.__table__, "moments.ndjson")
+
+@app.get("/api/export/participants.ndjson")
+def export_participants():
+    """Export all event participations as NDJSON"""
+    return _export_ndjson(EventParticipant.__table__, "participants.ndjson")
+
 # ============= Run Server =============
 
 if __name__ == "__main__":
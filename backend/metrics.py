@@ -0,0 +1,265 @@
+# metrics.py - Prometheus metrics for the API and the database layer
+#
+# MetricsMiddleware records per-route request counts, latency, response size
+# and requests in flight, plus how many SQL statements each request ran and
+# how long they took (from before/after_cursor_execute on every engine).
+# Connection pool stats are read from database.pool_status() when scraped.
+#
+# Metrics are kept per worker process: with several uvicorn workers, each one
+# reports its own numbers.
+#
+# Off unless METRICS_ENABLED=true. /metrics has no authentication and shows
+# route templates, pool sizes and SQL timings, so when enabled keep it
+# reachable only by the scraper (internal network or a proxy rule).
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from database import pool_status
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # bytes
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """A labelled metric family; values are keyed by the tuple of label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.extend(self._render_value(label_values, value))
+        return lines
+
+    def _render_value(self, label_values: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labels, label_values)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values) -> None:
+        self.inc(*label_values, amount=-1)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, *label_values, value: float) -> None:
+        with self._lock:
+            counts = self._values.get(label_values)
+            if counts is None:
+                # One count per bucket, then +Inf, then the sum
+                counts = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def _render_value(self, label_values: tuple, counts) -> list:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        lines = []
+        for bound, count in zip(bounds, counts):
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {counts[-1]}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {counts[-2]}")
+        return lines
+
+
+ROUTE_LABELS = ("method", "route")
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status code", ROUTE_LABELS + ("status",))
+http_request_duration = Histogram("http_request_duration_seconds", "Time to send the full response", ROUTE_LABELS)
+http_requests_in_progress = Gauge("http_requests_in_progress", "Requests being handled", ROUTE_LABELS)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size as sent (after compression)", ROUTE_LABELS, SIZE_BUCKETS
+)
+db_request_statements = Histogram(
+    "db_request_statements", "SQL statements executed per request", ROUTE_LABELS, STATEMENT_BUCKETS
+)
+db_request_duration = Histogram(
+    "db_request_duration_seconds", "Time spent executing SQL statements per request", ROUTE_LABELS
+)
+
+REQUEST_METRICS = (
+    http_requests, http_request_duration, http_requests_in_progress, http_response_size,
+    db_request_statements, db_request_duration,
+)
+
+
+# ---------- SQL statement tracking ----------
+
+class RequestStats:
+    """SQL statements run while handling the current request"""
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# Start times are a stack of (execution context, start) in conn.info, which
+# outlives the request on a pooled connection
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["metrics_query_start"].pop()[1]
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += seconds
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """Drop the start time of a statement that failed, so it does not pair with the next one"""
+    conn = exception_context.connection
+    starts = conn.info.get("metrics_query_start") if conn is not None else None
+    # Only if the failure came between before and after_cursor_execute
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+# ---------- Middleware ----------
+
+def _route_path(app, scope) -> str:
+    """The matched route's path template, so ids do not each get their own series"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the request metrics above"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Starlette puts the application in the scope before running its middleware
+        labels = (scope["method"], _route_path(scope["app"], scope))
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_progress.inc(*labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_request_duration.observe(*labels, value=time.perf_counter() - start)
+            http_requests_in_progress.dec(*labels)
+            http_requests.inc(*labels, str(status_code))
+            http_response_size.observe(*labels, value=size)
+            db_request_statements.observe(*labels, value=stats.statements)
+            db_request_duration.observe(*labels, value=stats.seconds)
+            _request_stats.reset(token)
+
+
+# ---------- Exposition ----------
+
+# pool_status() key -> (metric name, type, help)
+POOL_METRICS = {
+    "size": ("db_pool_size", "gauge", "Connections the pool keeps open"),
+    "checked_out": ("db_pool_checked_out", "gauge", "Connections currently in use"),
+    "checked_in": ("db_pool_checked_in", "gauge", "Idle connections in the pool"),
+    "overflow": ("db_pool_overflow", "gauge", "Connections open beyond the pool size"),
+    "checkouts": ("db_pool_checkouts_total", "counter", "Connection checkouts"),
+    "connects": ("db_pool_connects_total", "counter", "New database connections opened"),
+    "invalidations": ("db_pool_invalidations_total", "counter", "Connections invalidated (e.g. after errors)"),
+    "timeouts": ("db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection"),
+    "wait_seconds_total": ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection"),
+}
+
+
+def _render_pools() -> list:
+    pools = pool_status()
+    lines = []
+    for key, (name, kind, documentation) in POOL_METRICS.items():
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        for pool_name, stats in pools.items():
+            if key in stats:
+                lines.append(f'{name}{{pool="{_escape(pool_name)}"}} {stats[key]}')
+    return lines
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines.extend(metric.render())
+    lines.extend(_render_pools())
+    return "\n".join(lines) + "\n"
@@ -1,7 +1,7 @@
 # models.py - Updated to match frontend
-from sqlalchemy import Column, Text, Integer, TIMESTAMP, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Text, Integer, TIMESTAMP, ForeignKey, UniqueConstraint, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from sqlalchemy.sql.expression import text
 
@@ -10,6 +10,11 @@ from database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at", "id"),
+        Index("ix_users_updated_at", "updated_at"),
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -23,6 +28,12 @@ class User(Base):
     bio = Column(Text, nullable=True)  # Added for user profiles
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Full-text search over name, email and department (email split on punctuation)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', full_name || ' ' || "
+        "regexp_replace(email, '[^[:alnum:]]+', ' ', 'g') || ' ' || coalesce(department, ''))",
+        persisted=True,
+    )))
 
     # Relationships
     events_created = relationship("Event", back_populates="creator")
@@ -34,6 +45,12 @@ class User(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_start_time", "start_time", "id"),
+        Index("ix_events_category_start_time", "category", "start_time", "id"),
+        Index("ix_events_creator_id_start_time", "creator_id", "start_time", "id"),
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -50,7 +67,14 @@ class Event(Base):
     end_time = Column(TIMESTAMP(timezone=True), nullable=True)
     max_participants = Column(Integer, nullable=True)
     status = Column(Text, nullable=False, server_default=text("'active'"))
+    participant_count = Column(Integer, nullable=False, server_default=text("0"))  # Maintained by join/leave
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Full-text search over title, description and location
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', title || ' ' || coalesce(description, '') || ' ' || location)",
+        persisted=True,
+    )))
 
     # Relationships
     creator = relationship("User", back_populates="events_created")
@@ -60,6 +84,11 @@ class Event(Base):
 
 class EventParticipant(Base):
     __tablename__ = "event_participants"
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="event_participants_event_id_user_id_key"),
+        Index("idx_event_participants_user_id", "user_id"),
+        Index("ix_event_participants_event_id_joined_at", "event_id", "joined_at", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -78,6 +107,11 @@ class EventParticipant(Base):
 
 class Friendship(Base):
     __tablename__ = "friendships"
+    __table_args__ = (
+        Index("ix_friendships_user_id_friend_id_status", "user_id", "friend_id", "status"),
+        # Both directions, any status; accepted-only lookups use them too
+        Index("ix_friendships_friend_id_status", "friend_id", "status"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -88,6 +122,7 @@ class Friendship(Base):
     friend_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     status = Column(Text, nullable=False, server_default=text("'pending'"))  # pending, accepted, rejected
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", foreign_keys=[user_id], back_populates="friendships_initiated")
@@ -96,6 +131,11 @@ class Friendship(Base):
 
 class Moment(Base):
     __tablename__ = "moments"
+    __table_args__ = (
+        Index("ix_moments_created_at", "created_at", "id"),
+        Index("ix_moments_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_moments_event_id_created_at", "event_id", "created_at", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -107,6 +147,7 @@ class Moment(Base):
     photo_url = Column(Text, nullable=False)
     caption = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="moments")
@@ -0,0 +1,256 @@
+# profiler.py - Opt-in per-request SQL profiler
+#
+# With SQL_PROFILER=true every statement a request runs is recorded and, when
+# the request is done:
+#
+#   - statements are grouped by shape (the SQL with bind parameters and IN
+#     lists collapsed); a SELECT shape repeated SQL_PROFILER_N_PLUS_ONE times
+#     or more is logged as a likely N+1 (typically a lazy relationship loaded
+#     in a loop)
+#   - statements slower than SQL_SLOW_QUERY_MS are logged with their
+#     EXPLAIN ANALYZE plan, taken on the same connection inside a savepoint
+#     that is rolled back, so writes are not applied twice
+#   - a Server-Timing header splits the time to the first response byte into
+#     db, serialize (response model validation and JSON encoding), explain
+#     (profiler overhead) and other
+#
+# Flagged requests are also kept in memory for GET /health/profiler. This
+# slows requests down; it is meant for development and staging.
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_PROFILER = os.getenv("SQL_PROFILER", "false").lower() in ("1", "true", "yes")
+SQL_PROFILER_N_PLUS_ONE = int(os.getenv("SQL_PROFILER_N_PLUS_ONE", 5))  # repeats of one SELECT shape
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 100))
+SQL_PROFILER_EXPLAIN = os.getenv("SQL_PROFILER_EXPLAIN", "true").lower() in ("1", "true", "yes")
+SQL_PROFILER_HISTORY = int(os.getenv("SQL_PROFILER_HISTORY", 100))  # flagged requests kept for /health/profiler
+
+logger = logging.getLogger(__name__)
+
+_BIND_PARAMETER = re.compile(r"(?:%\(\w+\)s|\$\d+|%s|\?)(?:::\w+(?:\[\])?)?")  # with any ::TYPE cast
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with bind parameters and IN lists collapsed, so repeats group together"""
+    shape = _BIND_PARAMETER.sub("?", statement)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestProfile:
+    """Statements and timings collected for one request"""
+
+    def __init__(self):
+        self.statements = []  # (shape, seconds)
+        self.slow = []  # (seconds, statement, plan)
+        self.explain_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.handler_end = None
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def n_plus_one(self) -> list:
+        """SELECT shapes repeated at least SQL_PROFILER_N_PLUS_ONE times, most frequent first"""
+        counts = Counter(shape for shape, _ in self.statements if shape.upper().startswith("SELECT"))
+        return [
+            {
+                "shape": shape,
+                "count": count,
+                "ms": round(sum(seconds for s, seconds in self.statements if s == shape) * 1000, 3),
+            }
+            for shape, count in counts.most_common()
+            if count >= SQL_PROFILER_N_PLUS_ONE
+        ]
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+_history = deque(maxlen=SQL_PROFILER_HISTORY)
+_history_lock = threading.Lock()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """EXPLAIN ANALYZE a statement on its own connection, undoing any writes it makes"""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT sql_profiler_explain")
+        try:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile.get() is not None:
+        conn.info.setdefault("profiler_query_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is None or not conn.info.get("profiler_query_start"):
+        return
+    seconds = time.perf_counter() - conn.info["profiler_query_start"].pop()[1]
+    profile.statements.append((statement_shape(statement), seconds))
+
+    if seconds * 1000 < SQL_SLOW_QUERY_MS:
+        return
+    plan = None
+    if SQL_PROFILER_EXPLAIN and not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+        start = time.perf_counter()
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as error:
+            plan = f"(EXPLAIN failed: {error})"
+        profile.explain_seconds += time.perf_counter() - start
+    profile.slow.append((seconds, statement, plan))
+
+
+def _handle_error(exception_context):
+    """Drop the start time of a statement that failed, so it does not pair with the next one"""
+    conn = exception_context.connection
+    starts = conn.info.get("profiler_query_start") if conn is not None else None
+    # Only if the failure came between before and after_cursor_execute
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+if SQL_PROFILER:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization time for the current request"""
+    profile = _profile.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.serialize_seconds += time.perf_counter() - start
+
+
+def _handler_done() -> None:
+    profile = _profile.get()
+    if profile is not None:
+        profile.handler_end = time.perf_counter()
+
+
+def mark_handler_end(handler):
+    """Wrap a route endpoint so the profiler knows when it returned.
+
+    What happens between then and the first response byte is FastAPI
+    validating and encoding the result.
+    """
+    if inspect.iscoroutinefunction(handler):
+        @wraps(handler)
+        async def endpoint(*args, **kwargs):
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                _handler_done()
+    else:
+        @wraps(handler)
+        def endpoint(*args, **kwargs):
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                _handler_done()
+    return endpoint
+
+
+def _server_timing(profile: RequestProfile, start: float, first_byte: float) -> str:
+    db = profile.db_seconds
+    serialize = profile.serialize_seconds
+    if profile.handler_end is not None:
+        serialize += max(first_byte - profile.handler_end, 0.0)
+    total = first_byte - start
+    other = max(total - db - serialize - profile.explain_seconds, 0.0)
+    parts = [
+        f'db;dur={db * 1000:.2f};desc="{len(profile.statements)} queries"',
+        f"serialize;dur={serialize * 1000:.2f}",
+        f"other;dur={other * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ]
+    if profile.explain_seconds:
+        parts.insert(2, f"explain;dur={profile.explain_seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _report(method: str, path: str, profile: RequestProfile, total: float) -> None:
+    """Log and remember a request's N+1 patterns and slow queries"""
+    repeated = profile.n_plus_one()
+    for group in repeated:
+        logger.warning("Possible N+1 in %s %s: %d x %s (%.1f ms)", method, path, group["count"], group["shape"], group["ms"])
+    for seconds, statement, plan in profile.slow:
+        logger.warning("Slow query in %s %s (%.1f ms): %s\n%s", method, path, seconds * 1000, statement, plan or "")
+
+    if repeated or profile.slow:
+        with _history_lock:
+            _history.append({
+                "method": method,
+                "path": path,
+                "statements": len(profile.statements),
+                "db_ms": round(profile.db_seconds * 1000, 3),
+                "total_ms": round(total * 1000, 3),
+                "n_plus_one": repeated,
+                "slow": [
+                    {"ms": round(seconds * 1000, 3), "statement": statement, "plan": plan}
+                    for seconds, statement, plan in profile.slow
+                ],
+            })
+
+
+def recent_reports() -> list:
+    """Recently flagged requests, newest first"""
+    with _history_lock:
+        return list(reversed(_history))
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware that profiles each request's SQL and adds a Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = _server_timing(profile, start, time.perf_counter())
+                message = {**message, "headers": list(message["headers"]) + [(b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            _report(scope["method"], scope["path"], profile, time.perf_counter() - start)
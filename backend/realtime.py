@@ -0,0 +1,188 @@
+# realtime.py - Push event changes (joins, leaves, creates, deletes) to clients
+#
+# Handlers call publish(db, message) inside their transaction. Messages are
+# only delivered once it commits:
+#
+#   REALTIME_BACKEND=postgres  one pg_notify per commit; every worker LISTENs
+#                              and feeds its own hub, so all workers' clients
+#                              see all changes (default)
+#   REALTIME_BACKEND=memory    straight into this process's hub (one worker)
+#   REALTIME_BACKEND=none      disabled
+#
+# LISTEN needs a session-level connection: behind PgBouncer in transaction
+# mode point REALTIME_LISTEN_URL at Postgres directly.
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from database import DATABASE_URL
+
+REALTIME_BACKEND = os.getenv("REALTIME_BACKEND", "postgres")  # postgres, memory or none
+REALTIME_LISTEN_URL = os.getenv("REALTIME_LISTEN_URL", DATABASE_URL)
+REALTIME_CHANNEL = "tumatch_events"
+REALTIME_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", 256))  # messages buffered per subscriber
+REALTIME_RECONNECT_MAX_SECONDS = float(os.getenv("REALTIME_RECONNECT_MAX_SECONDS", 30))  # listener retry backoff cap
+
+logger = logging.getLogger(__name__)
+
+
+def sse_frame(message: dict) -> str:
+    """Render a message as a server-sent event"""
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+
+RESYNC_FRAME = sse_frame({"type": "resync"})
+
+
+class Subscription:
+    """One connected client: a bounded queue of SSE frames on its event loop, optionally filtered by event id"""
+
+    def __init__(self, loop, event_ids: Optional[set]):
+        self.loop = loop
+        self.event_ids = event_ids
+        self.queue = asyncio.Queue(maxsize=REALTIME_QUEUE_SIZE)
+
+    def wants(self, message: dict) -> bool:
+        return self.event_ids is None or message.get("event_id") in self.event_ids
+
+    def put(self, frame: str) -> None:
+        """Runs on the subscriber's loop; a client that fell behind is told to resync"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class EventHub:
+    """In-process fan-out of messages to subscriptions, safe to publish from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._listener = None
+
+    def subscribe(self, event_ids: Optional[Iterable[str]] = None) -> Subscription:
+        if REALTIME_BACKEND == "postgres":
+            self._start_listener()
+        subscription = Subscription(asyncio.get_running_loop(), set(event_ids) if event_ids else None)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, message: dict) -> None:
+        # Render once, then wake each event loop once for all of its subscribers
+        frame = sse_frame(message)
+        by_loop = {}
+        with self._lock:
+            for subscription in self._subscriptions:
+                if subscription.wants(message):
+                    by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, subscriptions, frame)
+            except RuntimeError:
+                # The subscribers' loop has closed
+                with self._lock:
+                    self._subscriptions.difference_update(subscriptions)
+
+    @staticmethod
+    def _deliver(subscriptions: list, frame: str) -> None:
+        for subscription in subscriptions:
+            subscription.put(frame)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": REALTIME_BACKEND,
+                "subscribers": len(self._subscriptions),
+                "listening": self._listener is not None and self._listener.is_alive(),
+            }
+
+    def _start_listener(self) -> None:
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="realtime-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        """LISTEN on the channel and publish every notification to this process's subscribers"""
+        listen_engine = create_engine(REALTIME_LISTEN_URL, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        disconnected = False
+        delay = 1.0
+        while True:
+            try:
+                connection = listen_engine.raw_connection()
+                try:
+                    dbapi_connection = connection.dbapi_connection
+                    dbapi_connection.autocommit = True
+                    dbapi_connection.cursor().execute(f"LISTEN {REALTIME_CHANNEL}")
+                    if disconnected:
+                        # Messages sent while disconnected are lost; tell clients to refetch, once
+                        logger.info("Realtime listener reconnected")
+                        self.publish({"type": "resync"})
+                        disconnected = False
+                    delay = 1.0
+                    while True:
+                        if select.select([dbapi_connection], [], [], 30) == ([], [], []):
+                            continue
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            self.publish(json.loads(dbapi_connection.notifies.pop(0).payload))
+                finally:
+                    connection.invalidate()
+            except Exception:
+                if not disconnected:
+                    logger.exception("Realtime listener lost its connection, reconnecting")
+                disconnected = True
+                time.sleep(delay)
+                delay = min(delay * 2, REALTIME_RECONNECT_MAX_SECONDS)
+
+
+event_hub = EventHub()
+
+
+def publish(db: Session, message: dict) -> None:
+    """Queue a message to be delivered when db's transaction commits"""
+    if REALTIME_BACKEND != "none":
+        db.info.setdefault("realtime_messages", []).append(message)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session) -> None:
+    # NOTIFY is transactional: Postgres delivers it only if the commit succeeds
+    messages = session.info.get("realtime_messages")
+    if messages and REALTIME_BACKEND == "postgres":
+        session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": REALTIME_CHANNEL, "payloads": [json.dumps(message, default=str) for message in messages]},
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    messages = session.info.pop("realtime_messages", None)
+    if messages and REALTIME_BACKEND == "memory":
+        for message in messages:
+            event_hub.publish(json.loads(json.dumps(message, default=str)))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("realtime_messages", None)
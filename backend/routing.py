@@ -0,0 +1,43 @@
+# routing.py - Run route handlers on the async database stack when enabled
+import inspect
+from functools import wraps
+
+from fastapi import Depends
+from fastapi.routing import APIRoute
+
+from database import DB_ASYNC, get_db, get_async_db
+from profiler import SQL_PROFILER, mark_handler_end
+
+
+def _async_endpoint(handler):
+    """Wrap a sync handler that takes `db: Session = Depends(get_db)`.
+
+    The wrapper is a coroutine that receives an AsyncSession instead and runs
+    the handler body through AsyncSession.run_sync, so its queries go over
+    asyncpg on the event loop rather than blocking a threadpool worker.
+    """
+    signature = inspect.signature(handler)
+    parameters = [
+        parameter.replace(default=Depends(get_async_db)) if parameter.name == "db" else parameter
+        for parameter in signature.parameters.values()
+    ]
+
+    @wraps(handler)
+    async def endpoint(*args, db, **kwargs):
+        return await db.run_sync(lambda session: handler(*args, db=session, **kwargs))
+
+    endpoint.__signature__ = signature.replace(parameters=parameters)
+    return endpoint
+
+
+class DatabaseRoute(APIRoute):
+    """APIRoute that swaps get_db handlers onto the async stack if DB_ASYNC is set
+    (and times handlers for the SQL profiler if SQL_PROFILER is set)"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        db_parameter = inspect.signature(endpoint).parameters.get("db")
+        if DB_ASYNC and db_parameter is not None and getattr(db_parameter.default, "dependency", None) is get_db:
+            endpoint = _async_endpoint(endpoint)
+        if SQL_PROFILER:
+            endpoint = mark_handler_end(endpoint)
+        super().__init__(path, endpoint, **kwargs)
@@ -10,7 +10,10 @@ CREATE TABLE IF NOT EXISTS users (
   department TEXT,
   bio TEXT,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
-  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('simple', full_name || ' ' || regexp_replace(email, '[^[:alnum:]]+', ' ', 'g') || ' ' || coalesce(department, ''))
+  ) STORED
 );
 
 -- Events table
@@ -26,7 +29,12 @@ CREATE TABLE IF NOT EXISTS events (
   end_time TIMESTAMP WITH TIME ZONE,
   max_participants INTEGER,
   status TEXT NOT NULL DEFAULT 'active',
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+  participant_count INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('simple', title || ' ' || coalesce(description, '') || ' ' || location)
+  ) STORED
 );
 
 -- Friendships table
@@ -35,7 +43,8 @@ CREATE TABLE IF NOT EXISTS friendships (
   user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
   friend_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
   status TEXT NOT NULL DEFAULT 'pending',
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
 );
 
 -- Event participants table
@@ -55,9 +64,25 @@ CREATE TABLE IF NOT EXISTS moments (
   event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
   photo_url TEXT NOT NULL,
   caption TEXT,
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
 );
 
 -- Optional: useful indexes
 CREATE INDEX IF NOT EXISTS idx_event_participants_event_id ON event_participants(event_id);
 CREATE INDEX IF NOT EXISTS idx_event_participants_user_id ON event_participants(user_id);
+CREATE INDEX IF NOT EXISTS ix_event_participants_event_id_joined_at ON event_participants(event_id, joined_at, id);
+CREATE INDEX IF NOT EXISTS ix_users_created_at ON users(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users(updated_at);
+CREATE INDEX IF NOT EXISTS ix_events_start_time ON events(start_time, id);
+CREATE INDEX IF NOT EXISTS ix_events_category_start_time ON events(category, start_time, id);
+CREATE INDEX IF NOT EXISTS ix_events_creator_id_start_time ON events(creator_id, start_time, id);
+CREATE INDEX IF NOT EXISTS ix_friendships_user_id_friend_id_status ON friendships(user_id, friend_id, status);
+CREATE INDEX IF NOT EXISTS ix_friendships_friend_id_status ON friendships(friend_id, status);
+CREATE INDEX IF NOT EXISTS ix_moments_created_at ON moments(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_moments_user_id_created_at ON moments(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_moments_event_id_created_at ON moments(event_id, created_at, id);
+
+-- Full-text search
+CREATE INDEX IF NOT EXISTS ix_events_search_vector ON events USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_users_search_vector ON users USING GIN (search_vector);
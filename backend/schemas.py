@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # ---------- USER SCHEMAS ----------
 
@@ -134,6 +134,7 @@ class FriendshipBase(BaseModel):
 # ---------- MOMENT SCHEMAS ----------
 
 class MomentCreate(BaseModel):
+    user_id: UUID
     event_id: UUID
     photo_url: str
     caption: Optional[str] = None
@@ -157,6 +158,66 @@ class MomentBase(BaseModel):
         from_attributes = True
 
 
+# ---------- PROFILE SCHEMAS ----------
+
+class FriendInfo(BaseModel):
+    """Accepted friend as shown on a profile"""
+    friendship_id: UUID
+    user_id: UUID
+    full_name: str
+    profile_photo: Optional[str] = None
+    department: Optional[str] = None
+
+
+class UserProfileBundle(BaseModel):
+    """Everything a profile page renders, in one response"""
+    user: UserBase
+    created_events: List[EventBase] = []
+    joined_events: List[EventBase] = []
+    friends: List[FriendInfo] = []
+    moments: List[MomentBase] = []
+    # Friendship between the viewer_id passed in and this user, in any status
+    viewer_friendship: Optional[FriendshipBase] = None
+
+
+# ---------- BATCH SCHEMAS ----------
+
+MAX_BATCH_SIZE = 100
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[UUID] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class UserBatchResponse(BaseModel):
+    """Found users in request order, plus the ids that do not exist"""
+    items: List[UserBase]
+    missing: List[UUID] = []
+
+
+class EventBatchResponse(BaseModel):
+    """Found events in request order, plus the ids that do not exist"""
+    items: List[EventWithParticipants]
+    missing: List[UUID] = []
+
+
+class ParticipationBatchRequest(BaseModel):
+    join: List[UUID] = Field(default=[], max_length=MAX_BATCH_SIZE)
+    leave: List[UUID] = Field(default=[], max_length=MAX_BATCH_SIZE)
+
+
+class ParticipationResult(BaseModel):
+    """Outcome of one join/leave, with the status code the single-item endpoint would return"""
+    event_id: UUID
+    action: str  # join or leave
+    status: int
+    detail: Optional[str] = None
+
+
+class ParticipationBatchResponse(BaseModel):
+    results: List[ParticipationResult]
+
+
 # Response aliases for API endpoints
 UserResponse = UserBase
 UserWithEvents = UserBase
@@ -109,6 +109,11 @@ INSERT INTO event_participants (event_id, user_id, status) VALUES
   ('10000000-0000-0000-0000-000000000008'::uuid, '00000000-0000-0000-0000-000000000002'::uuid, 'joined'),
   ('10000000-0000-0000-0000-000000000008'::uuid, '00000000-0000-0000-0000-000000000005'::uuid, 'joined');
 
+-- Sync the denormalized participant counters
+UPDATE events SET participant_count = (
+  SELECT COUNT(*) FROM event_participants WHERE event_participants.event_id = events.id
+);
+
 -- Create friendships
 INSERT INTO friendships (user_id, friend_id, status) VALUES
   ('00000000-0000-0000-0000-000000000001'::uuid, '00000000-0000-0000-0000-000000000002'::uuid, 'accepted'),
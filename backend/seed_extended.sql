@@ -42,8 +42,10 @@ INSERT INTO moments (id, user_id, event_id, photo_url, caption, created_at) VALU
 ('20000000-0000-0000-0000-000000000010', '00000000-0000-0000-0000-000000000003', '10000000-0000-0000-0000-000000000007', 'https://images.unsplash.com/photo-1498243691581-b145c3f54a5a?w=800', 'Bouldering session - great workout! 🧗', NOW() - INTERVAL '8 hours'),
 ('20000000-0000-0000-0000-000000000011', '00000000-0000-0000-0000-000000000004', '10000000-0000-0000-0000-000000000008', 'https://images.unsplash.com/photo-1516975080664-ed2fc6a32937?w=800', 'Poker night was fun! 🃏', NOW() - INTERVAL '1 day');
 
--- Update participant counts (trigger should handle this, but just in case)
--- This is already handled by the backend when fetching events, so no action needed
+-- Sync the denormalized participant counters
+UPDATE events SET participant_count = (
+  SELECT COUNT(*) FROM event_participants WHERE event_participants.event_id = events.id
+);
 
 SELECT 'Extended seed data inserted successfully!' as status;
 SELECT COUNT(*) as total_events FROM events;
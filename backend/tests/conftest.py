@@ -0,0 +1,135 @@
+# conftest.py - Fixtures for the API tests
+#
+# The tests run the app in-process against the database in DATABASE_URL
+# (main.py creates missing tables). Everything they insert belongs to users
+# with an @tests.tum.de email and is deleted afterwards; deleting the users
+# cascades to the rest. Run from backend/: python -m pytest
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from database import engine
+
+DOMAIN = "tests.tum.de"
+CATEGORY = "tests"
+USERS = 30
+EVENTS = 25
+PARTICIPANTS_PER_EVENT = 8
+FRIENDS = 20
+MOMENTS = 40
+
+
+def _cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": DOMAIN})
+
+
+@pytest.fixture(scope="session")
+def client():
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip(f"database not reachable at {engine.url!r} (set DATABASE_URL)")
+    # Imported here: main.py creates missing tables on import
+    from main import app
+
+    # Used as a context manager so every request runs on the same event loop (DB_ASYNC)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def fixture_ids(client) -> dict:
+    """Seed users, events, participants, friendships and moments; return the ids tests call routes with.
+
+    Pages hold more rows than any statement budget, so a relationship
+    loaded once per row (N+1) cannot stay under one.
+    """
+    _cleanup()
+    params = {"domain": DOMAIN, "category": CATEGORY, "users": USERS, "events": EVENTS,
+              "participants": PARTICIPANTS_PER_EVENT, "friends": FRIENDS, "moments": MOMENTS}
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO users (email, full_name, department)
+            SELECT 'user' || n || '@' || :domain, 'Test User ' || n, 'Informatics'
+            FROM generate_series(1, :users) AS n
+            """
+        ), params)
+        conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time, participant_count)
+            SELECT u.id, 'Test event ' || n, :category, 'Garching', now() + n * interval '1 hour', :participants
+            FROM generate_series(1, :events) AS n
+            JOIN users u ON u.email = 'user' || (n % :users + 1) || '@' || :domain
+            """
+        ), params)
+        # Participants are users 2..participants+1, so the last user stays free to join
+        conn.execute(text(
+            """
+            INSERT INTO event_participants (event_id, user_id)
+            SELECT e.id, u.id FROM events e CROSS JOIN generate_series(2, :participants + 1) AS n
+            JOIN users u ON u.email = 'user' || n || '@' || :domain
+            WHERE e.category = :category
+            """
+        ), params)
+        conn.execute(text(
+            """
+            INSERT INTO friendships (user_id, friend_id, status)
+            SELECT me.id, u.id, 'accepted' FROM generate_series(3, :friends + 2) AS n
+            JOIN users me ON me.email = 'user2@' || :domain
+            JOIN users u ON u.email = 'user' || n || '@' || :domain
+            """
+        ), params)
+        conn.execute(text(
+            """
+            INSERT INTO moments (user_id, event_id, photo_url)
+            SELECT p.user_id, p.event_id, '/moments/test-' || row_number() OVER () || '.jpg'
+            FROM (SELECT p.* FROM event_participants p JOIN events e ON e.id = p.event_id
+                  WHERE e.category = :category LIMIT :moments) AS p
+            """
+        ), params)
+        # User 2 joined every event, has friends and posted moments
+        ids = conn.execute(text(
+            """
+            SELECT (SELECT id FROM users WHERE email = 'user2@' || :domain),
+                   (SELECT id FROM users WHERE email = 'user' || :users || '@' || :domain),
+                   (SELECT event_id FROM moments m JOIN events e ON e.id = m.event_id
+                    WHERE e.category = :category GROUP BY event_id ORDER BY count(*) DESC LIMIT 1),
+                   (SELECT m.id FROM moments m JOIN events e ON e.id = m.event_id
+                    WHERE e.category = :category LIMIT 1)
+            """
+        ), params).one()
+        event_ids = [str(event_id) for event_id, in conn.execute(
+            text("SELECT id FROM events WHERE category = :category"), params
+        )]
+    yield {
+        "domain": DOMAIN, "category": CATEGORY, "user_id": str(ids[0]), "joiner_id": str(ids[1]),
+        "event_id": str(ids[2]), "moment_id": str(ids[3]), "event_ids": event_ids,
+    }
+    _cleanup()
+
+
+@contextmanager
+def _capture_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def capture_statements():
+    """`with capture_statements() as statements:` records the SQL sent to any engine"""
+    return _capture_statements
@@ -0,0 +1,97 @@
+# test_events.py - Regression tests for the event endpoints
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from cache import event_cache
+from database import engine
+
+
+def test_event_list_runs_a_constant_number_of_queries(client, fixture_ids, capture_statements):
+    """Participant previews and joined flags are fetched for the whole page, not per event"""
+    counts = []
+    for limit in (1, 5, 25):
+        event_cache.invalidate_all()
+        with capture_statements() as statements:
+            response = client.get("/api/events", params={
+                "category": fixture_ids["category"], "current_user_id": fixture_ids["user_id"], "limit": limit,
+            })
+        assert response.status_code == 200
+        events = response.json()
+        assert len(events) == limit
+        assert all(event["participants"] and event["current_user_joined"] for event in events)
+        counts.append(len(statements))
+
+    assert counts == [counts[0]] * len(counts), counts
+    assert counts[0] <= 3
+
+
+@pytest.fixture
+def capped_event(fixture_ids):
+    """A 10-seat event and 130 users who have not joined it"""
+    params = {"domain": fixture_ids["domain"], "creator_id": fixture_ids["user_id"]}
+    with engine.begin() as conn:
+        event_id = conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time, max_participants)
+            VALUES (:creator_id, 'Capped event', 'capped', 'Garching', now() + interval '1 day', 10)
+            RETURNING id
+            """
+        ), params).scalar_one()
+        user_ids = conn.execute(text(
+            """
+            INSERT INTO users (email, full_name)
+            SELECT 'joiner' || n || '@' || :domain, 'Joiner ' || n FROM generate_series(1, 130) AS n
+            RETURNING id
+            """
+        ), params).scalars().all()
+    yield str(event_id), [str(user_id) for user_id in user_ids]
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM events WHERE id = :id"), {"id": event_id})
+        conn.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": user_ids})
+
+
+def test_concurrent_joins_do_not_overbook(client, capped_event):
+    """130 simultaneous joins on a 10-seat event: exactly 10 succeed"""
+    event_id, user_ids = capped_event
+
+    def join(user_id):
+        return client.post(f"/api/events/{event_id}/join", json={"event_id": event_id, "user_id": user_id}).status_code
+
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        statuses = Counter(pool.map(join, user_ids))
+
+    assert statuses == {201: 10, 400: 120}
+    with engine.connect() as conn:
+        participant_count, participants = conn.execute(text(
+            """
+            SELECT participant_count, (SELECT count(*) FROM event_participants WHERE event_id = :id)
+            FROM events WHERE id = :id
+            """
+        ), {"id": event_id}).one()
+    assert participant_count == participants == 10
+
+
+def test_not_modified_keeps_vary_and_the_etag_of_the_cached_copy(client, fixture_ids):
+    """A 304 varies like the 200 it revalidates; only encoded bodies get a weak ETag"""
+    params = {"category": fixture_ids["category"]}
+    headers = {"Origin": "http://localhost:5173", "Accept-Encoding": "gzip"}
+
+    response = client.get("/api/events", params=params, headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith("W/")
+    vary = {value.strip() for value in response.headers["vary"].split(",")}
+    assert {"Accept-Encoding", "Origin"} <= vary
+
+    not_modified = client.get("/api/events", params=params, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert {value.strip() for value in not_modified.headers["vary"].split(",")} == vary
+
+    identity = client.get("/api/events", params=params, headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == etag.removeprefix("W/")
+    assert "Accept-Encoding" in identity.headers["vary"]
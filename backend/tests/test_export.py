@@ -0,0 +1,113 @@
+# test_export.py - Memory stays flat while streaming a large NDJSON export
+#
+# Seeds EXPORT_TEST_ROWS participations (1000 users x rows/1000 events),
+# streams /api/export/participants.ndjson while discarding the body, and fails
+# if the process's peak RSS grew by more than EXPORT_TEST_MAX_RSS_GROWTH_MB.
+# The request goes straight to the ASGI app on the client's event loop, since
+# TestClient itself buffers whole response bodies.
+#
+# Slow (a million rows by default), so it only runs when asked for:
+#     python -m pytest -m slow
+import asyncio
+import os
+import resource
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from database import engine
+
+ROWS = int(os.getenv("EXPORT_TEST_ROWS", 1_000_000))
+MAX_RSS_GROWTH_MB = int(os.getenv("EXPORT_TEST_MAX_RSS_GROWTH_MB", 64))
+
+EXPORT_DOMAIN = "export.tests.tum.de"
+EXPORT_CATEGORY = "tests-export"
+USERS = 1000
+
+
+def _cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE '%@' || :domain"), {"domain": EXPORT_DOMAIN})
+
+
+@pytest.fixture
+def export_rows(client):
+    """Seed ROWS participations; returns how many were inserted"""
+    _cleanup()
+    params = {"domain": EXPORT_DOMAIN, "category": EXPORT_CATEGORY, "users": USERS, "events": max(ROWS // USERS, 1)}
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO users (email, full_name)
+            SELECT 'user' || n || '@' || :domain, 'Export User ' || n FROM generate_series(1, :users) AS n
+            """
+        ), params)
+        conn.execute(text(
+            """
+            INSERT INTO events (creator_id, title, category, location, start_time)
+            SELECT (SELECT id FROM users WHERE email = 'user1@' || :domain),
+                   'Export event ' || n, :category, 'Garching', now()
+            FROM generate_series(1, :events) AS n
+            """
+        ), params)
+        rows = conn.execute(text(
+            """
+            INSERT INTO event_participants (event_id, user_id)
+            SELECT e.id, u.id FROM events e CROSS JOIN users u
+            WHERE e.category = :category AND u.email LIKE '%@' || :domain
+            """
+        ), params).rowcount
+    yield rows
+    _cleanup()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def _stream(app, path: str) -> tuple:
+    """Run one GET through the ASGI app, returning (status, lines) without keeping the body"""
+    totals = {"status": None, "lines": 0}
+    requested, finished = False, asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client stays connected until the whole body has been sent
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            totals["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            totals["lines"] += message.get("body", b"").count(b"\n")
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 0), "server": ("testserver", 80), "root_path": "",
+    }
+    await app(scope, receive, send)
+    return totals["status"], totals["lines"]
+
+
+@pytest.mark.slow
+def test_participants_export_memory_is_bounded(client, export_rows):
+    # Warm up imports, pools and the first batch before taking the baseline
+    client.portal.call(_stream, client.app, "/api/export/events.ndjson")
+    baseline = _peak_rss_mb()
+
+    status, lines = client.portal.call(_stream, client.app, "/api/export/participants.ndjson")
+    growth = _peak_rss_mb() - baseline
+
+    assert status == 200
+    assert lines >= export_rows
+    assert growth <= MAX_RSS_GROWTH_MB, f"peak RSS grew {growth:.1f} MB while exporting {lines} rows"
@@ -0,0 +1,103 @@
+# test_index_advisor.py - Fail if an API read path needs a sequential scan
+#
+# Calls GET routes and EXPLAINs every SELECT they issue, with sequential scans
+# disabled, on the connection that ran it (primary, replica or async engine
+# alike). Any Seq Scan left in a plan means no index can serve that access
+# path; it fails the test if the table holds at least INDEX_ADVISOR_MIN_ROWS
+# rows (pg_class.reltuples, default 0).
+import json
+import os
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from cache import event_cache
+from database import engine
+
+MIN_ROWS = int(os.getenv("INDEX_ADVISOR_MIN_ROWS", 0))
+
+# (route, query params); {user_id}, {event_id} and {category} come from the fixture
+ROUTES = [
+    ("/api/users", {}),
+    ("/api/users", {"search": "tum"}),
+    ("/api/users/{user_id}", {}),
+    ("/api/users/{user_id}/profile", {}),
+    ("/api/events", {}),
+    ("/api/events", {"category": "{category}"}),
+    ("/api/events", {"creator_id": "{user_id}"}),
+    ("/api/events", {"search": "study"}),
+    ("/api/events", {"current_user_id": "{user_id}"}),
+    ("/api/events/{event_id}", {}),
+    ("/api/events/{event_id}/participants", {}),
+    ("/api/users/{user_id}/friendships", {}),
+    ("/api/users/{user_id}/friendships", {"status_filter": "accepted"}),
+    ("/api/moments", {}),
+    ("/api/moments", {"user_id": "{user_id}"}),
+    ("/api/moments", {"event_id": "{event_id}"}),
+]
+
+
+def _seq_scans(plan: dict):
+    """Yield the relation of every Seq Scan node in an EXPLAIN JSON plan"""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def _explain(conn, statement: str, parameters) -> dict:
+    """EXPLAIN a statement with seq scans disabled, on the connection (and transaction) that ran it"""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT index_advisor")
+        try:
+            # SET LOCAL is undone with the savepoint
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            result = cursor.fetchone()[0]
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT index_advisor")
+    finally:
+        cursor.close()
+    plan = result if isinstance(result, list) else json.loads(result)
+    return plan[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def table_rows(fixture_ids) -> dict:
+    # Refresh reltuples so the size threshold reflects the current data
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+        rows = conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        ))
+        return {name: count for name, count in rows}
+
+
+@pytest.mark.parametrize("route,params", ROUTES, ids=[f"{route} {params or ''}".strip() for route, params in ROUTES])
+def test_read_path_uses_indexes(client, fixture_ids, table_rows, route, params):
+    plans = []
+
+    def explain_select(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            plans.append((statement, _explain(conn, statement, parameters)))
+
+    event_cache.invalidate_all()
+    event.listen(Engine, "after_cursor_execute", explain_select)
+    try:
+        response = client.get(route.format(**fixture_ids), params={
+            key: value.format(**fixture_ids) for key, value in params.items()
+        })
+    finally:
+        event.remove(Engine, "after_cursor_execute", explain_select)
+    assert response.status_code == 200, response.text
+    assert plans
+
+    failures = [
+        f"Seq Scan on {table}: {' '.join(statement.split())[:200]}"
+        for statement, plan in plans
+        for table in set(_seq_scans(plan))
+        if table_rows.get(table, 0) >= MIN_ROWS
+    ]
+    assert not failures, "\n".join(failures)
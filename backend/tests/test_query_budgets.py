@@ -0,0 +1,86 @@
+# test_query_budgets.py - Per-route upper bounds on SQL statements and latency
+#
+# Each route is called with the event cache emptied first, so the uncached
+# path is measured. The statement count must stay within budget on every call;
+# the median time of QUERY_BUDGET_REPEAT calls must stay within the time
+# budget times QUERY_BUDGET_TIME_SCALE (raise it on slow CI machines).
+import os
+import statistics
+import time
+
+import pytest
+
+from cache import event_cache
+
+REPEAT = int(os.getenv("QUERY_BUDGET_REPEAT", 5))
+TIME_SCALE = float(os.getenv("QUERY_BUDGET_TIME_SCALE", 1.0))
+
+# (name, method, path, params or JSON body, max statements, max milliseconds).
+# {category}, {user_id}, {event_id}, {moment_id} and {joiner_id} come from the fixture.
+# Join and leave budgets include the pg_notify sent with REALTIME_BACKEND=postgres.
+BUDGETS = [
+    ("events list", "GET", "/api/events", {"category": "{category}"}, 3, 100),
+    ("events list for a user", "GET", "/api/events", {"category": "{category}", "current_user_id": "{user_id}"}, 3, 100),
+    ("event detail", "GET", "/api/events/{event_id}", {}, 2, 50),
+    ("events batch get", "POST", "/api/events:batchGet", {"ids": "{event_ids}"}, 2, 100),
+    ("event participants", "GET", "/api/events/{event_id}/participants", {}, 2, 50),
+    ("join event", "POST", "/api/events/{event_id}/join", {"event_id": "{event_id}", "user_id": "{joiner_id}"}, 3, 50),
+    ("leave event", "DELETE", "/api/events/{event_id}/leave/{joiner_id}", {}, 3, 50),
+    ("users list", "GET", "/api/users", {"search": "test"}, 1, 100),
+    ("user", "GET", "/api/users/{user_id}", {}, 2, 50),
+    ("user profile", "GET", "/api/users/{user_id}/profile", {}, 6, 150),
+    ("friendships", "GET", "/api/users/{user_id}/friendships", {}, 2, 50),
+    ("moments list", "GET", "/api/moments", {"user_id": "{user_id}"}, 3, 100),
+    ("moments for an event", "GET", "/api/moments", {"event_id": "{event_id}"}, 3, 100),
+    ("moment", "GET", "/api/moments/{moment_id}", {}, 2, 50),
+]
+
+
+def _fill(value, ids: dict):
+    """Substitute fixture ids into a path, parameter or body value"""
+    if value == "{event_ids}":
+        return ids["event_ids"]
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def _join(client, ids: dict):
+    return client.post(f"/api/events/{ids['event_id']}/join",
+                       json={"event_id": ids["event_id"], "user_id": ids["joiner_id"]})
+
+
+def _leave(client, ids: dict):
+    return client.delete(f"/api/events/{ids['event_id']}/leave/{ids['joiner_id']}")
+
+
+@pytest.mark.parametrize(
+    "method, route, payload, max_statements, max_ms",
+    [budget[1:] for budget in BUDGETS],
+    ids=[budget[0] for budget in BUDGETS],
+)
+def test_route_budget(client, fixture_ids, capture_statements, method, route, payload, max_statements, max_ms):
+    path, payload = _fill(route, fixture_ids), _fill(payload, fixture_ids)
+    times = []
+    for _ in range(REPEAT + 1):  # the first call warms up and is not timed
+        # Join and leave are undone (or prepared) outside the measured call so they repeat
+        if route.endswith("/leave/{joiner_id}"):
+            _join(client, fixture_ids)
+        event_cache.invalidate_all()
+        with capture_statements() as statements:
+            start = time.perf_counter()
+            if method in ("GET", "DELETE"):
+                response = client.request(method, path, params=payload)
+            else:
+                response = client.request(method, path, json=payload)
+            times.append((time.perf_counter() - start) * 1000)
+        if route.endswith("/join"):
+            _leave(client, fixture_ids)
+
+        assert response.status_code < 400, response.text
+        assert len(statements) <= max_statements, "\n".join(statements)
+
+    median_ms = statistics.median(times[1:])
+    assert median_ms <= max_ms * TIME_SCALE, f"median {median_ms:.1f} ms over the {max_ms * TIME_SCALE:.0f} ms budget"
@@ -75,6 +75,7 @@ export default function CreateEvent() {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['events'] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
       navigate(createPageUrl('Feed'));
     },
     onError: (error: any) => {
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { apiClient } from '@/api/apiClient';
+import { useEventStream } from '@/api/eventStream';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { createPageUrl } from '@/utils';
@@ -46,6 +47,9 @@ export default function EventDetail() {
     enabled: !!eventId,
   });
 
+  // Keeps the event and its participants current while the page is open
+  useEventStream(eventId);
+
   const isJoined = currentUser && dbParticipants.some((p: any) => String(p.user_id) === String(currentUser.id));
 
   console.log('EventDetails - isJoined:', isJoined, 'currentUser:', currentUser?.id, 'dbParticipants:', dbParticipants.map((p: any) => p.user_id));
@@ -59,9 +63,11 @@ export default function EventDetail() {
       });
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['eventParticipants', eventId] });
-      queryClient.invalidateQueries({ queryKey: ['event', eventId] });
+      // Refetch our own change; the event stream may be off, connecting or blocked
       queryClient.invalidateQueries({ queryKey: ['events'] });
+      queryClient.invalidateQueries({ queryKey: ['event', eventId] });
+      queryClient.invalidateQueries({ queryKey: ['eventParticipants', eventId] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
     },
     onError: (error: any) => {
       console.error('Error joining event:', error);
@@ -79,9 +85,10 @@ export default function EventDetail() {
     },
     onSuccess: () => {
       setShowConfirmModal(false);
-      queryClient.invalidateQueries({ queryKey: ['eventParticipants', eventId] });
-      queryClient.invalidateQueries({ queryKey: ['event', eventId] });
       queryClient.invalidateQueries({ queryKey: ['events'] });
+      queryClient.invalidateQueries({ queryKey: ['event', eventId] });
+      queryClient.invalidateQueries({ queryKey: ['eventParticipants', eventId] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
     },
     onError: (error: any) => {
       console.error('Error leaving event:', error);
@@ -112,6 +119,7 @@ export default function EventDetail() {
     onSuccess: () => {
       // Invalidate lists and navigate back to MyEvents
       queryClient.invalidateQueries({ queryKey: ['events'] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
       queryClient.invalidateQueries({ queryKey: ['event', eventId] });
       navigate(createPageUrl('MyEvents'));
     },
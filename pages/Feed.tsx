@@ -1,5 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { apiClient } from '@/api/apiClient';
+import { useEventStream } from '@/api/eventStream';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { createPageUrl } from '@/utils';
@@ -30,6 +31,9 @@ export default function Feed() {
     enabled: !!currentUser,
   });
 
+  // Other users' joins and leaves are kept current from the event stream
+  useEventStream();
+
   useEffect(() => {
     if (events.length > 0 && currentUser) {
       // Use the current_user_joined field from the backend
@@ -65,10 +69,12 @@ export default function Feed() {
       // Return context for rollback
       return { previousJoinedEvents: new Set(joinedEvents) };
     },
-    onSuccess: (_, event: any) => {
-      // Refetch to get updated data from backend
+    onSuccess: (_data: any, event: any) => {
+      // Refetch our own change; the event stream may be off, connecting or blocked
       queryClient.invalidateQueries({ queryKey: ['events', currentUser?.id] });
       queryClient.invalidateQueries({ queryKey: ['event', event.id] });
+      queryClient.invalidateQueries({ queryKey: ['eventParticipants', event.id] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
     },
     onError: (error: any, event: any, context: any) => {
       // Rollback on error
@@ -104,9 +110,12 @@ export default function Feed() {
       // Return context for rollback
       return { previousJoinedEvents: new Set(joinedEvents) };
     },
-    onSuccess: (_, event: any) => {
+    onSuccess: (_data: any, event: any) => {
+      // Refetch our own change; the event stream may be off, connecting or blocked
       queryClient.invalidateQueries({ queryKey: ['events', currentUser?.id] });
       queryClient.invalidateQueries({ queryKey: ['event', event.id] });
+      queryClient.invalidateQueries({ queryKey: ['eventParticipants', event.id] });
+      queryClient.invalidateQueries({ queryKey: ['profile'] });
     },
     onError: (error: any, event: any, context: any) => {
       // Rollback on error
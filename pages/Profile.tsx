@@ -18,25 +18,16 @@ export default function Profile() {
     queryFn: () => apiClient.getCurrentUser(),
   });
 
-  const { data: moments = [], isLoading: momentsLoading } = useQuery({
-    queryKey: ['moments', currentUser?.id],
-    queryFn: () => currentUser?.id ? apiClient.getMoments(currentUser.id) : Promise.resolve([]),
-    enabled: !!currentUser,
+  // One request for everything the profile shows
+  const { data: profile, isLoading: momentsLoading } = useQuery({
+    queryKey: ['profile', currentUser?.id],
+    queryFn: () => apiClient.getUserProfile(currentUser.id),
+    enabled: !!currentUser?.id,
   });
 
-  const { data: friendships = [] } = useQuery({
-    queryKey: ['friendships', currentUser?.id],
-    queryFn: () => currentUser?.id ? apiClient.getFriendships(currentUser.id) : Promise.resolve([]),
-    enabled: !!currentUser,
-  });
-
-  const { data: allEvents = [] } = useQuery({
-    queryKey: ['events'],
-    queryFn: () => apiClient.getEvents(),
-  });
-
-  // Filter events created by current user
-  const myEvents = allEvents.filter((event: any) => event.creator_id === currentUser?.id);
+  const moments = profile?.moments ?? [];
+  const friendships = profile?.friends ?? [];
+  const myEvents = profile?.created_events ?? [];
 
   if (userLoading) {
     return (
@@ -20,44 +20,19 @@ export default function UserProfile() {
     queryFn: () => apiClient.getCurrentUser(),
   });
 
-  // Fetch the viewed user's data from backend
-  const { data: user, isLoading: userLoading, error: userError } = useQuery({
-    queryKey: ['user', userId],
-    queryFn: () => apiClient.getUser(userId as string),
-    enabled: !!userId,
+  // The profile page renders entirely from the aggregated profile endpoint
+  const profileKey = ['profile', userId, currentUser?.id];
+  const { data: profile, isLoading: profileLoading } = useQuery({
+    queryKey: profileKey,
+    queryFn: () => apiClient.getUserProfile(userId as string, currentUser?.id),
+    enabled: !!userId && !!currentUser,
   });
 
-  // Fallback: fetch all users and try to match by id if direct fetch failed
-  const { data: allUsers = [] } = useQuery({
-    queryKey: ['users', 'fallback', userId],
-    queryFn: () => apiClient.getUsers(),
-    enabled: !!userId && !!userError,
-  });
-
-  const { data: moments = [] } = useQuery({
-    queryKey: ['moments', userId],
-    queryFn: () => apiClient.getMoments(userId as string),
-    enabled: !!userId,
-  });
-
-  const { data: friendships = [] } = useQuery({
-    queryKey: ['friendships', userId],
-    queryFn: () => apiClient.getFriendships(userId as string),
-    enabled: !!userId,
-  });
+  const moments = profile?.moments ?? [];
+  const events = profile?.joined_events ?? [];
+  const friends = profile?.friends ?? [];
 
-  const { data: events = [] } = useQuery({
-    queryKey: ['userEvents', userId],
-    queryFn: async () => {
-      const all: any[] = await apiClient.getEvents();
-      return all.filter(e => e.participants?.some((p: any) => String(p.user_id) === String(userId)));
-    },
-    enabled: !!userId,
-  });
-
-  const matchedFallback = allUsers.find((u: any) => String(u.id) === String(userId));
-
-  const displayUser = user || matchedFallback || {
+  const displayUser = profile?.user || {
     id: userId,
     full_name: 'TUM Student',
     email: 'student@tum.de',
@@ -68,83 +43,51 @@ export default function UserProfile() {
 
   const isOwnProfile = currentUser?.id === userId;
 
-  // Determine if current user and viewed user are already friends (either direction)
-  const isFriend = friendships.some((f: any) => {
-    const a = String(f.user_id);
-    const b = String(f.friend_id);
-    const me = String(currentUser?.id);
-    const them = String(displayUser?.id || userId);
-    return ((a === me && b === them) || (a === them && b === me)) && f.status === 'accepted';
-  });
+  // The current user's friendship with the viewed user (either direction, any status)
+  const existingFriendship = profile?.viewer_friendship ?? null;
+  const isFriend = existingFriendship?.status === 'accepted';
 
   const queryClient = useQueryClient();
-  // Find existing friendship object (any direction)
-  const existingFriendship = friendships.find((f: any) => {
-    const a = String(f.user_id);
-    const b = String(f.friend_id);
-    const me = String(currentUser?.id);
-    const them = String(displayUser?.id || userId);
-    return (a === me && b === them) || (a === them && b === me);
-  });
+  const setViewerFriendship = (friendship: any) =>
+    queryClient.setQueryData(profileKey, (old: any) => (old ? { ...old, viewer_friendship: friendship } : old));
 
   const createFriendMutation = useMutation({
     mutationFn: (data: { user_id: string; friend_id: string }) => apiClient.createFriendship(data),
     onMutate: async (data) => {
-      await queryClient.cancelQueries({ queryKey: ['friendships', userId] });
-      await queryClient.cancelQueries({ queryKey: ['friendships', currentUser?.id] });
-
-      const prevForUser = queryClient.getQueryData(['friendships', userId]) as any[] | undefined;
-      const prevForMe = queryClient.getQueryData(['friendships', currentUser?.id]) as any[] | undefined;
-
-      const tempId = `temp-${Date.now()}`;
-      const optimistic = {
-        id: tempId,
+      await queryClient.cancelQueries({ queryKey: profileKey });
+      const previous = existingFriendship;
+      setViewerFriendship({
+        id: `temp-${Date.now()}`,
         user_id: data.user_id,
         friend_id: data.friend_id,
         status: 'pending',
         created_at: new Date().toISOString(),
-      };
-
-      queryClient.setQueryData(['friendships', userId], (old: any[] | undefined) => {
-        return old ? [...old, optimistic] : [optimistic];
-      });
-      queryClient.setQueryData(['friendships', currentUser?.id], (old: any[] | undefined) => {
-        return old ? [...old, optimistic] : [optimistic];
       });
-
-      return { prevForUser, prevForMe, tempId };
+      return { previous };
     },
     onError: (err, variables, context: any) => {
-      if (context?.prevForUser) queryClient.setQueryData(['friendships', userId], context.prevForUser);
-      if (context?.prevForMe) queryClient.setQueryData(['friendships', currentUser?.id], context.prevForMe);
+      setViewerFriendship(context?.previous ?? null);
     },
     onSettled: () => {
-      queryClient.invalidateQueries(['friendships', userId]);
       queryClient.invalidateQueries(['friendships', currentUser?.id]);
+      queryClient.invalidateQueries(['profile']);
     }
   });
 
   const deleteFriendMutation = useMutation({
     mutationFn: (friendship_id: string) => apiClient.deleteFriendship(friendship_id),
-    onMutate: async (friendship_id: string) => {
-      await queryClient.cancelQueries({ queryKey: ['friendships', userId] });
-      await queryClient.cancelQueries({ queryKey: ['friendships', currentUser?.id] });
-
-      const prevForUser = queryClient.getQueryData(['friendships', userId]) as any[] | undefined;
-      const prevForMe = queryClient.getQueryData(['friendships', currentUser?.id]) as any[] | undefined;
-
-      queryClient.setQueryData(['friendships', userId], (old: any[] | undefined) => (old || []).filter(f => String(f.id) !== String(friendship_id)));
-      queryClient.setQueryData(['friendships', currentUser?.id], (old: any[] | undefined) => (old || []).filter(f => String(f.id) !== String(friendship_id)));
-
-      return { prevForUser, prevForMe };
+    onMutate: async () => {
+      await queryClient.cancelQueries({ queryKey: profileKey });
+      const previous = existingFriendship;
+      setViewerFriendship(null);
+      return { previous };
     },
     onError: (err, variables, context: any) => {
-      if (context?.prevForUser) queryClient.setQueryData(['friendships', userId], context.prevForUser);
-      if (context?.prevForMe) queryClient.setQueryData(['friendships', currentUser?.id], context.prevForMe);
+      setViewerFriendship(context?.previous ?? null);
     },
     onSettled: () => {
-      queryClient.invalidateQueries(['friendships', userId]);
       queryClient.invalidateQueries(['friendships', currentUser?.id]);
+      queryClient.invalidateQueries(['profile']);
     }
   });
 
@@ -161,7 +104,7 @@ export default function UserProfile() {
     );
   }
 
-  if (userLoading) {
+  if (profileLoading) {
     return (
       <div className="min-h-screen bg-white flex items-center justify-center">
         <div className="w-10 h-10 border-4 border-accent border-t-transparent rounded-full animate-spin" />
@@ -231,7 +174,7 @@ export default function UserProfile() {
             </div>
             <div className="w-px h-8 bg-gray-200" />
             <div className="text-center">
-              <p className="text-xl font-bold text-gray-900">{friendships.length}</p>
+              <p className="text-xl font-bold text-gray-900">{friends.length}</p>
               <p className="text-xs text-gray-500 uppercase tracking-wider">Friends</p>
             </div>
           </div>